@@ -1,5 +1,12 @@
 from django.contrib import admin
 
 from companies.models import Company
+from hunting.paginator import EstimatedCountPaginator
 
-admin.site.register(Company)
+
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "logo")
+    search_fields = ("^name",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from companies.models import Company
+from companies.views import COMPANY_LIST_CACHE
+from hunting.cache import bump_namespace_version
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_list_cache(sender, **kwargs):
+    bump_namespace_version(COMPANY_LIST_CACHE)
@@ -1,3 +1,61 @@
-from django.test import TestCase
+import io
+import shutil
+import struct
+import tempfile
+import zlib
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from companies.models import Company
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+# the logo upload limit (a burst of 5) would otherwise be shared by every test
+@override_settings(RATE_LIMITS={"company_logo": (1000, 1000)})
+class CompanyLogoTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.company = Company.objects.create(name="acme")
+
+    def upload(self, content, name="logo.png"):
+        logo = SimpleUploadedFile(name, content, content_type="image/png")
+        return self.client.post(f"/company/{self.company.pk}/logo/", {"logo": logo})
+
+    def test_upload_is_content_addressed(self):
+        image = io.BytesIO()
+        Image.new("RGB", (16, 16), "red").save(image, "PNG")
+
+        first = self.upload(image.getvalue())
+        second = self.upload(image.getvalue(), name="again.png")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.json()["logo"].endswith(".png"))
+        self.assertEqual(first.json()["logo"], second.json()["logo"])
+
+    def test_not_an_image(self):
+        response = self.upload(b"definitely not a png")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Logo is not a valid image"})
+
+    def test_decompression_bomb_is_rejected(self):
+        # a few bytes whose header declares 100000x100000 pixels
+        header = struct.pack(">IIBBBBB", 100000, 100000, 8, 2, 0, 0, 0)
+        content = (
+            b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", header)
+            + png_chunk(b"IDAT", zlib.compress(b"\0" * 10)) + png_chunk(b"IEND", b"")
+        )
+
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Logo is larger than 2048x2048"})
@@ -0,0 +1,65 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from PIL import Image, ImageFile
+
+IMAGE_EXTENSIONS = {"JPEG": ".jpg"}
+
+
+# spools the upload to a temporary file while hashing it and reading the image
+# header, so oversized files are rejected before they are read completely
+class LogoUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.error = None
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.parser = ImageFile.Parser()
+        self.image_format = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.LOGO_MAX_UPLOAD_SIZE:
+            self.skip(f"Logo is larger than {settings.LOGO_MAX_UPLOAD_SIZE} bytes")
+
+        if self.parser is not None:
+            self.check_dimensions(raw_data)
+
+        self.sha256.update(raw_data)
+        super().receive_data_chunk(raw_data, start)
+
+    def check_dimensions(self, raw_data):
+        max_width, max_height = settings.LOGO_MAX_DIMENSIONS
+        try:
+            self.parser.feed(raw_data)
+        except Image.DecompressionBombError:
+            # Pillow refuses headers declaring far more pixels than any logo needs
+            self.skip(f"Logo is larger than {max_width}x{max_height}")
+        except (OSError, SyntaxError):
+            self.skip("Logo is not a valid image")
+
+        image = self.parser.image
+        if image is None:
+            return
+
+        if image.width > max_width or image.height > max_height:
+            self.skip(f"Logo is larger than {max_width}x{max_height}")
+
+        self.image_format = image.format
+        # the header is all we need, stop decoding the rest of the image
+        self.parser = None
+
+    def skip(self, error):
+        self.error = error
+        raise SkipFile()
+
+    def file_complete(self, file_size):
+        if self.image_format is None:
+            self.error = "Logo is not a valid image"
+            return None
+
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.content_hash = self.sha256.hexdigest()
+        uploaded_file.extension = IMAGE_EXTENSIONS.get(self.image_format, f".{self.image_format.lower()}")
+        return uploaded_file
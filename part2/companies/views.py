@@ -1,31 +1,73 @@
 import json
 
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.utils.decorators import method_decorator
+from django.utils.encoding import filepath_to_uri
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import ListView, CreateView, UpdateView
 
 from companies.models import Company
+from companies.uploadhandlers import LogoUploadHandler
+from hunting.cache import cached_json_response
+from hunting.ratelimit import rate_limit
+
+COMPANY_LIST_CACHE = "companies:list"
+
+MEDIA_PREFIX = settings.MEDIA_URL
+
+
+def serialize_companies(rows):
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "logo": MEDIA_PREFIX + filepath_to_uri(row["logo"]) if row["logo"] else None,
+        }
+        for row in rows
+    ]
 
 
 class CompanyListView(ListView):
     model = Company
 
     def get(self, request, *args, **kwargs):
-        super().get(request, *args, **kwargs)
-
-        companies = []
-        for company in self.object_list:
-            companies.append({
-                "id": company.id,
-                "name": company.name,
-                "logo": company.logo.url,
+        return cached_json_response(request, COMPANY_LIST_CACHE, self.build_response)
+
+    def build_response(self):
+        companies_qs = Company.objects.order_by("id").values("id", "name", "logo")
+
+        cursor = self.request.GET.get("cursor")
+        if cursor is not None:
+            try:
+                companies_qs = companies_qs.filter(id__gt=int(cursor))
+            except ValueError:
+                return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+            companies = list(companies_qs[:settings.TOTAL_ON_PAGE + 1])
+            has_more = len(companies) > settings.TOTAL_ON_PAGE
+            companies = companies[:settings.TOTAL_ON_PAGE]
+
+            return JsonResponse({
+                "items": serialize_companies(companies),
+                "next_cursor": companies[-1]["id"] if has_more else None,
             })
 
-        return JsonResponse(companies, safe=False)
+        paginator = Paginator(companies_qs, settings.TOTAL_ON_PAGE)
+        page_number = self.request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+
+        return JsonResponse({
+            "items": serialize_companies(page_obj),
+            "num_pages": page_obj.paginator.num_pages,
+            "total": page_obj.paginator.count,
+        })
 
 
 @method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(rate_limit("company_logo"), name='dispatch')
 class CompanyImageView(UpdateView):
     model = Company
     fields = ["name", "logo"]
@@ -33,8 +75,21 @@ class CompanyImageView(UpdateView):
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
 
-        self.object.logo = request.FILES["logo"]
-        self.objects.save()
+        upload_handler = LogoUploadHandler(request)
+        request.upload_handlers = [upload_handler]
+
+        logo = request.FILES.get("logo")
+        if logo is None:
+            error = getattr(upload_handler, "error", None) or "Logo is required"
+            return JsonResponse({"error": error}, status=400)
+
+        # content-addressed name, so companies uploading the same logo share one file
+        logo_name = f"logos/{logo.content_hash[:2]}/{logo.content_hash}{logo.extension}"
+        if not default_storage.exists(logo_name):
+            logo_name = default_storage.save(logo_name, logo)
+
+        self.object.logo.name = logo_name
+        self.object.save()
 
         return JsonResponse({
             "id": self.object.id,
@@ -0,0 +1,7 @@
+# gunicorn -c gunicorn.conf.py
+# the application is imported and warmed once in the master, then forked,
+# background threads (log listener, explain executor) restart in each worker via os.register_at_fork
+
+wsgi_app = "hunting.wsgi_preload:application"
+preload_app = True
+workers = 4
@@ -13,4 +13,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hunting.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from vacancies.stream import vacancy_stream  # noqa: E402, needs the app registry loaded above
+
+
+async def application(scope, receive, send):
+    # the SSE stream is served outside Django so it does not hold a worker thread per client
+    if scope["type"] == "http" and scope["path"] == "/vacancy/stream/":
+        return await vacancy_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,118 @@
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from hunting.compression import choose_encoding, compress
+
+
+def get_namespace_version(namespace):
+    version = cache.get(f"{namespace}:version")
+    if version is None:
+        version = bump_namespace_version(namespace)
+    return version
+
+
+def bump_namespace_version(namespace):
+    version = time.time_ns()
+    cache.set(f"{namespace}:version", version, None)
+    return version
+
+
+def get_response_cache_key(namespace, request):
+    query_string = urlencode(sorted(request.GET.lists()), doseq=True)
+    return f"{namespace}:{get_namespace_version(namespace)}:{request.path}?{query_string}"
+
+
+class SingleFlight:
+    # concurrent misses for the same key wait for one build instead of all
+    # hitting the database: a lock per key inside the process and a cache.add
+    # lock between processes
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def get_key_lock(self, key):
+        with self.lock:
+            key_lock, waiters = self.key_locks.get(key, (threading.Lock(), 0))
+            self.key_locks[key] = (key_lock, waiters + 1)
+            return key_lock
+
+    def release_key_lock(self, key):
+        with self.lock:
+            key_lock, waiters = self.key_locks[key]
+            if waiters == 1:
+                del self.key_locks[key]
+            else:
+                self.key_locks[key] = (key_lock, waiters - 1)
+
+    def get_or_build(self, key, build):
+        bodies = cache.get(key)
+        if bodies is not None:
+            return bodies, None
+
+        key_lock = self.get_key_lock(key)
+        try:
+            with key_lock:
+                bodies = cache.get(key)
+                if bodies is not None:
+                    return bodies, None
+                # add also fails when the backend errors, only wait if the lock is really held
+                if not cache.add(f"{key}:lock", 1, settings.SINGLE_FLIGHT_TIMEOUT) and cache.get(f"{key}:lock"):
+                    bodies = self.wait_for(key)
+                    if bodies is not None:
+                        return bodies, None
+
+                try:
+                    return build()
+                finally:
+                    cache.delete(f"{key}:lock")
+        finally:
+            self.release_key_lock(key)
+
+    def wait_for(self, key):
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            bodies = cache.get(key)
+            if bodies is not None:
+                return bodies
+        return None
+
+
+single_flight = SingleFlight()
+
+
+def cached_json_response(request, namespace, build_response):
+    key = get_response_cache_key(namespace, request)
+
+    def build():
+        response = build_response()
+        if response.status_code != 200:
+            return None, response
+        bodies = {"identity": response.content}
+        cache.set(key, bodies, settings.RESPONSE_CACHE_TIMEOUT)
+        return bodies, None
+
+    bodies, uncached_response = single_flight.get_or_build(key, build)
+    if uncached_response is not None:
+        return uncached_response
+
+    if len(bodies["identity"]) < settings.COMPRESSION_MIN_SIZE:
+        return HttpResponse(bodies["identity"], content_type="application/json")
+
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return HttpResponse(bodies["identity"], content_type="application/json")
+
+    if encoding not in bodies:
+        # compress once and keep the result next to the plain body
+        bodies[encoding] = compress(bodies["identity"], encoding)
+        cache.set(key, bodies, settings.RESPONSE_CACHE_TIMEOUT)
+
+    response = HttpResponse(bodies[encoding], content_type="application/json")
+    response["Content-Encoding"] = encoding
+    return response
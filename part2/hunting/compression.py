@@ -0,0 +1,47 @@
+import gzip
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def get_supported_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(request):
+    accepted = {}
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[encoding.strip().lower()] = quality
+
+    for encoding in get_supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=settings.BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(response):
+    return (
+        not response.streaming
+        and not response.has_header("Content-Encoding")
+        and response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES)
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
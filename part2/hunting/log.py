@@ -0,0 +1,74 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "duration"):
+            entry["duration"] = record.duration
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return random.random() < self.rate
+
+
+class QueueListenerHandler(QueueHandler):
+    # puts records on a bounded queue and writes them from a background thread,
+    # records are dropped instead of blocking the request when the queue is full
+    def __init__(self, queue_size=10000, stream=None):
+        super().__init__(queue.Queue(queue_size))
+        self.dropped = 0
+
+        target = logging.StreamHandler(stream)
+        target.setFormatter(JsonFormatter())
+        self.listener = QueueListener(self.queue, target, respect_handler_level=True)
+        self.listener.start()
+        self.listening = True
+        atexit.register(self.stop_listener)
+        os.register_at_fork(after_in_child=self.restart_listener)
+
+    def prepare(self, record):
+        # formatting happens in the listener thread, not on the request thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def restart_listener(self):
+        # threads do not survive fork, e.g. gunicorn with preload_app, so the child
+        # gets its own queue and listener, records queued in the parent stay with it
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.listener = QueueListener(self.queue, *self.listener.handlers, respect_handler_level=True)
+        if self.listening:
+            self.listener.start()
+
+    def stop_listener(self):
+        if self.listening:
+            self.listening = False
+            self.listener.stop()
+
+    def close(self):
+        self.stop_listener()
+        super().close()
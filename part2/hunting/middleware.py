@@ -0,0 +1,83 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from hunting.compression import choose_encoding, compress, is_compressible
+from hunting.profiling import PROFILE_SORT_KEYS, profile_collapsed, profile_stats
+from hunting.slowqueries import SlowQueryRecorder
+
+STRONG_ETAG_RE = re.compile(r'^"')
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header("Content-Encoding"):
+            # already compressed, e.g. a precompressed cache entry
+            patch_vary_headers(response, ("Accept-Encoding",))
+            return response
+
+        if not is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        if response.has_header("ETag"):
+            response["ETag"] = STRONG_ETAG_RE.sub('W/"', response["ETag"])
+        return response
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            view_name = resolve(request.path_info)._func_path
+        except Resolver404:
+            view_name = request.path_info
+
+        with connection.execute_wrapper(SlowQueryRecorder(view_name)):
+            return self.get_response(request)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get("__profile")
+        if not mode or not (settings.PROFILING_ENABLED or request.user.is_staff):
+            return self.get_response(request)
+
+        def run():
+            self.get_response(request)
+
+        if mode == "collapsed":
+            content = profile_collapsed(run, settings.PROFILING_SAMPLE_INTERVAL)
+            response = HttpResponse(content, content_type="text/plain")
+            response["Content-Disposition"] = 'attachment; filename="profile.collapsed"'
+            return response
+
+        sort_by = request.GET.get("__profile_sort", "cumulative")
+        if sort_by not in PROFILE_SORT_KEYS:
+            return JsonResponse({"error": f"__profile_sort must be one of: {', '.join(PROFILE_SORT_KEYS)}"}, status=400)
+        return HttpResponse(profile_stats(run, sort_by, settings.PROFILING_STATS_LIMIT), content_type="text/plain")
@@ -0,0 +1,52 @@
+import gc
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    # runs in the server's master process before it forks workers, so the
+    # warmed state is shared copy-on-write instead of rebuilt per worker
+    timings = {}
+
+    def phase(name, func):
+        started = time.perf_counter()
+        func()
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    phase("url_resolver", lambda: get_resolver().reverse_dict)
+    phase("model_metadata", lambda: [model._meta.get_fields() for model in apps.get_models()])
+    phase("skill_index", load_skill_index)
+    phase("requests", request_warm_urls)
+
+    # workers must open their own connections, sharing sockets across fork breaks them
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+    logger.info("Warm-up finished: %s", timings)
+    return timings
+
+
+def load_skill_index():
+    from vacancies.similarity import skill_index
+    skill_index.ensure_loaded()
+
+
+def request_warm_urls():
+    client = Client(HTTP_HOST="localhost")
+    for url in settings.PRELOAD_WARM_URLS:
+        try:
+            status = client.get(url).status_code
+        except Exception:
+            logger.exception("Warm-up request to %s failed", url)
+            continue
+        if status != 200:
+            logger.warning("Warm-up request to %s returned %s", url, status)
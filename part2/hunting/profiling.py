@@ -0,0 +1,107 @@
+import cProfile
+import gc
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from django.test import Client
+
+PROFILE_SORT_KEYS = sorted(key.value for key in pstats.SortKey)
+
+
+def profile_stats(func, sort_by, limit):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(sort_by).print_stats(limit)
+    return output.getvalue()
+
+
+class StackSampler:
+    # samples the stack of one thread from a background thread and counts the
+    # stacks in the collapsed format used by flamegraph.pl and speedscope
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_collapsed(func, interval):
+    with StackSampler(threading.get_ident(), interval) as sampler:
+        started = time.perf_counter()
+        func()
+    return sampler.collapsed() or f"# no samples in {time.perf_counter() - started:.4f}s\n"
+
+
+def trace_allocations(url, requests, limit, host="localhost"):
+    # snapshots after a warm-up request and after N more requests, so caches
+    # filled on the first hit do not show up as growth
+    client = Client(HTTP_HOST=host)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    try:
+        client.get(url)
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+
+        for _ in range(requests):
+            client.get(url)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+
+    return [
+        {
+            "file": stat.traceback[0].filename,
+            "line": stat.traceback[0].lineno,
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+            "size": stat.size,
+        }
+        for stat in stats[:limit]
+    ]
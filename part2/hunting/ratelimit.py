@@ -0,0 +1,161 @@
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+
+
+class TokenBucketLimiter:
+    # buckets are kept least recently used first: a bucket that has refilled is the same
+    # as a missing one and is dropped, RATE_LIMIT_MAX_BUCKETS bounds the rest, so clients
+    # rotating addresses cannot grow the worker without limit
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+
+    def take(self, key, rate, burst):
+        # returns 0 when a token was taken, otherwise seconds until the next one
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated, _ = self.buckets.pop(key, (burst, now, now))
+            tokens, wait = self.refill_and_take(tokens, updated, now, rate, burst)
+            self.buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            self.evict(now)
+        return wait
+
+    def evict(self, now):
+        while self.buckets:
+            key, (_, _, full_at) = next(iter(self.buckets.items()))
+            if full_at > now and len(self.buckets) <= settings.RATE_LIMIT_MAX_BUCKETS:
+                return
+            del self.buckets[key]
+
+    @staticmethod
+    def refill_and_take(tokens, updated, now, rate, burst):
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            return tokens - 1, 0
+        return tokens, (1 - tokens) / rate
+
+
+class CacheTokenBucketLimiter(TokenBucketLimiter):
+    # shares buckets between workers through a cache backend; read-modify-write
+    # is not atomic, so concurrent workers may let a few extra requests through
+    def __init__(self, alias):
+        super().__init__()
+        self.cache = caches[alias]
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        tokens, updated = self.cache.get(f"ratelimit:{key}", (burst, now))
+        tokens, wait = self.refill_and_take(tokens, updated, now, rate, burst)
+        self.cache.set(f"ratelimit:{key}", (tokens, now), math.ceil(burst / rate) + 1)
+        return wait
+
+
+class WriteLoadShedder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.db_latency = 0.0
+
+    def try_enter(self):
+        with self.lock:
+            if self.in_flight >= settings.WRITE_MAX_CONCURRENCY:
+                return False
+            # one request is always let through, so the latency estimate can recover
+            if self.in_flight and self.db_latency > settings.WRITE_SHED_DB_LATENCY:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - started
+            with self.lock:
+                self.db_latency = 0.8 * self.db_latency + 0.2 * duration
+
+
+limiter = None
+shedder = WriteLoadShedder()
+
+
+def get_limiter():
+    global limiter
+    if limiter is None:
+        if settings.RATE_LIMIT_CACHE:
+            limiter = CacheTokenBucketLimiter(settings.RATE_LIMIT_CACHE)
+        else:
+            limiter = TokenBucketLimiter()
+    return limiter
+
+
+def is_trusted_proxy(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(proxy) for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def get_client_ip(request):
+    # behind trusted proxies the client is the rightmost X-Forwarded-For
+    # address that none of them added, anything left of it can be forged
+    address = request.META.get("REMOTE_ADDR")
+    if not is_trusted_proxy(address):
+        return address
+
+    forwarded = [item.strip() for item in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if item.strip()]
+    for address in reversed(forwarded):
+        if not is_trusted_proxy(address):
+            return address
+    return address
+
+
+def get_client_id(request):
+    if settings.RATE_LIMIT_CLIENT_KEY:
+        return import_string(settings.RATE_LIMIT_CLIENT_KEY)(request)
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{get_client_ip(request)}"
+
+
+def rate_limit(scope):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            rate, burst = settings.RATE_LIMITS[scope]
+            wait = get_limiter().take(f"{scope}:{get_client_id(request)}", rate, burst)
+            if wait:
+                response = JsonResponse({"error": "Too many requests"}, status=429)
+                response["Retry-After"] = math.ceil(wait)
+                return response
+
+            if not shedder.try_enter():
+                response = JsonResponse({"error": "Service is overloaded"}, status=503)
+                response["Retry-After"] = settings.WRITE_RETRY_AFTER
+                return response
+
+            try:
+                with connection.execute_wrapper(shedder.record_query):
+                    return view_func(request, *args, **kwargs)
+            finally:
+                shedder.leave()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,168 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MISSING = object()
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class Field:
+    def __init__(self, required=True, default=MISSING, nullable=False):
+        self.required = required and default is MISSING
+        self.default = default
+        self.nullable = nullable
+
+    def compile(self):
+        check = self.compile_check()
+        nullable = self.nullable
+
+        def validate(value):
+            if value is None:
+                if nullable:
+                    return None
+                raise SchemaError("This field may not be null")
+            return check(value)
+
+        return validate
+
+    def compile_check(self):
+        raise NotImplementedError
+
+
+class String(Field):
+    def __init__(self, max_length=None, min_length=0, pattern=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.min_length = min_length
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def compile_check(self):
+        max_length, min_length, pattern = self.max_length, self.min_length, self.pattern
+
+        def check(value):
+            if not isinstance(value, str):
+                raise SchemaError("Must be a string")
+            if len(value) < min_length:
+                raise SchemaError(f"Must be at least {min_length} characters")
+            if max_length is not None and len(value) > max_length:
+                raise SchemaError(f"Must be at most {max_length} characters")
+            if pattern is not None and not pattern.fullmatch(value):
+                raise SchemaError("Has an invalid format")
+            return value
+
+        return check
+
+
+class Integer(Field):
+    def __init__(self, min_value=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+
+    def compile_check(self):
+        min_value = self.min_value
+
+        def check(value):
+            if isinstance(value, bool):
+                raise SchemaError("Must be an integer")
+            if isinstance(value, str):
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise SchemaError("Must be an integer")
+            if not isinstance(value, int):
+                raise SchemaError("Must be an integer")
+            if min_value is not None and value < min_value:
+                raise SchemaError(f"Must be at least {min_value}")
+            return value
+
+        return check
+
+
+class Choice(Field):
+    def __init__(self, choices, **kwargs):
+        super().__init__(**kwargs)
+        self.choices = frozenset(choices)
+
+    def compile_check(self):
+        choices = self.choices
+
+        def check(value):
+            if value not in choices:
+                raise SchemaError(f"Must be one of: {', '.join(sorted(choices))}")
+            return value
+
+        return check
+
+
+class List(Field):
+    def __init__(self, item, max_items=None, **kwargs):
+        super().__init__(**kwargs)
+        self.item = item
+        self.max_items = max_items
+
+    def compile_check(self):
+        validate_item, max_items = self.item.compile(), self.max_items
+
+        def check(value):
+            if not isinstance(value, list):
+                raise SchemaError("Must be a list")
+            if max_items is not None and len(value) > max_items:
+                raise SchemaError(f"Must have at most {max_items} items")
+            items = []
+            for position, item in enumerate(value):
+                try:
+                    items.append(validate_item(item))
+                except SchemaError as e:
+                    raise SchemaError(f"Item {position}: {e}")
+            return items
+
+        return check
+
+
+class Schema:
+    # validators are compiled once, parse() then validates and coerces the
+    # whole body in a single pass and collects the errors of every field
+    def __init__(self, fields):
+        self.fields = [
+            (name, field.required, field.default, field.compile())
+            for name, field in fields.items()
+        ]
+
+    def parse(self, body):
+        try:
+            data = loads(body)
+        except ValueError:
+            raise SchemaError({"body": "Invalid JSON"})
+        if not isinstance(data, dict):
+            raise SchemaError({"body": "Must be a JSON object"})
+
+        result, errors = {}, {}
+        for name, required, default, validate in self.fields:
+            value = data.get(name, MISSING)
+            if value is MISSING:
+                if required:
+                    errors[name] = "This field is required"
+                elif default is not MISSING:
+                    result[name] = default() if callable(default) else default
+                continue
+            try:
+                result[name] = validate(value)
+            except SchemaError as e:
+                errors[name] = str(e)
+
+        if errors:
+            raise SchemaError(errors)
+        return result
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,12 +44,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'hunting.middleware.CompressionMiddleware',
+    'hunting.middleware.SlowQueryMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'hunting.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'hunting.urls'
@@ -71,6 +75,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'hunting.wsgi.application'
 
+# requested once by hunting.wsgi_preload before the server forks its workers
+PRELOAD_WARM_URLS = [
+    '/vacancy/',
+    '/vacancy/skills/top/',
+    '/company/',
+]
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
@@ -87,6 +98,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# cached responses, their version keys, the single-flight locks and the hot vacancy list
+# are shared by all workers and management commands, so the cache lives outside the process:
+# memcached when CACHE_MEMCACHED_LOCATION is set (needs pymemcache), otherwise files in
+# CACHE_DIR, which only the processes of one host share
+
+CACHE_MEMCACHED_LOCATION = os.environ.get('CACHE_MEMCACHED_LOCATION')
+
+if CACHE_MEMCACHED_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_MEMCACHED_LOCATION.split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'hunting_cache')),
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -131,8 +170,72 @@ STATIC_URL = '/static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TOTAL_ON_PAGE = 10
-
-LOGGING = {
+CHANGES_ON_PAGE = 100
+BATCH_MAX_IDS = 100
+SIMILAR_MAX_LIMIT = 100
+TOP_SKILLS_MAX_LIMIT = 100
+SLUG_CACHE_SIZE = 10000
+# seconds between pulls of other workers' skill changes into the in-process
+# similarity index, and how far back each pull looks again
+SKILL_INDEX_SYNC_INTERVAL = 1
+SKILL_INDEX_SYNC_OVERLAP = 5
+# user ids checked on vacancy create, cached per process for this many seconds
+USER_EXISTS_CACHE_SIZE = 10000
+USER_EXISTS_CACHE_TIMEOUT = 60
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+# how long concurrent misses for one cache key wait for the request building it
+SINGLE_FLIGHT_TIMEOUT = 10
+# detail views are counted to pick what warm_cache pre-renders
+HOT_VACANCIES_SIZE = 1000
+HOT_VACANCIES_FLUSH_EVERY = 100
+# /vacancy/stream/ (ASGI only): events buffered per client, seconds between keep-alive comments,
+# between reconnect attempts of the LISTEN connection and of silence before it is checked
+VACANCY_STREAM_QUEUE_SIZE = 100
+VACANCY_STREAM_KEEPALIVE = 15
+VACANCY_STREAM_RECONNECT_DELAY = 1
+VACANCY_STREAM_HEALTH_CHECK_INTERVAL = 30
+# rows fetched and written per record batch by export_columnar
+EXPORT_CHUNK_SIZE = 50000
+
+# responses smaller than this are sent as is, brotli is used when installed
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# token buckets per client and scope: (tokens per second, burst size)
+RATE_LIMITS = {
+    "vacancy_create": (5, 20),
+    "vacancy_update": (5, 20),
+    "vacancy_delete": (5, 20),
+    "company_logo": (0.2, 5),
+}
+# cache alias to share buckets between workers, None keeps them in process memory
+RATE_LIMIT_CACHE = None
+# most buckets kept in process memory, the least recently used go first
+RATE_LIMIT_MAX_BUCKETS = 100000
+# addresses or networks of our own proxies (e.g. the nginx front-end), requests from
+# them are limited by the client address they put in X-Forwarded-For instead
+RATE_LIMIT_TRUSTED_PROXIES = []
+# dotted path to a function(request) -> str that replaces the user/IP client key
+RATE_LIMIT_CLIENT_KEY = None
+WRITE_MAX_CONCURRENCY = 8
+WRITE_SHED_DB_LATENCY = 0.5
+WRITE_RETRY_AFTER = 1
+
+# queries slower than this many seconds are kept in an in-process ring buffer,
+# a share of the slow SELECTs also gets its plan captured in the background
+SLOW_QUERY_THRESHOLD = 0.2
+SLOW_QUERY_EXPLAIN_RATE = 0.1
+SLOW_QUERY_LOG_SIZE = 200
+
+# ?__profile=1 returns cProfile stats and ?__profile=collapsed sampled stacks
+# instead of the response, for staff or for everyone when enabled here
+PROFILING_ENABLED = False
+PROFILING_STATS_LIMIT = 50
+PROFILING_SAMPLE_INTERVAL = 0.001
+MEMORY_PROFILE_MAX_REQUESTS = 500
+
+DEBUG_LOGGING = {
     'disable_existing_loggers': False,
     'version': 1,
     'handlers': {
@@ -159,5 +262,48 @@ LOGGING = {
     },
 }
 
+# production profile: JSON lines written by a background thread and only a
+# sample of the SQL statements logged by django.db.backends
+PRODUCTION_LOGGING = {
+    'disable_existing_loggers': False,
+    'version': 1,
+    'filters': {
+        'sample_queries': {
+            '()': 'hunting.log.SamplingFilter',
+            'rate': 0.01,
+        },
+    },
+    'handlers': {
+        'queue': {
+            '()': 'hunting.log.QueueListenerHandler',
+            'queue_size': 10000,
+            'level': 'DEBUG',
+        },
+    },
+    'loggers': {
+        '': {
+            'handlers': ['queue'],
+            'level': 'INFO',
+        },
+        'django.db.backends': {
+            'level': 'DEBUG',
+            'filters': ['sample_queries'],
+        },
+    },
+}
+
+LOGGING_PROFILE = os.environ.get('LOGGING_PROFILE', 'debug')
+LOGGING = PRODUCTION_LOGGING if LOGGING_PROFILE == 'production' else DEBUG_LOGGING
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# "python" streams files through FileResponse, "x-accel-redirect" (nginx) and
+# "x-sendfile" (apache, lighttpd) hand the file over to the front-end server
+MEDIA_SERVE_MODE = "python"
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+MEDIA_PUBLIC_DIRS = ['logos/']
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+LOGO_MAX_UPLOAD_SIZE = 2 * 1024 * 1024
+LOGO_MAX_DIMENSIONS = (2048, 2048)
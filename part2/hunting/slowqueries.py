@@ -0,0 +1,86 @@
+import os
+import random
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+
+def find_app_frame():
+    # the innermost frame from our own code, skipping django and this module
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(base_dir) and not frame.filename.endswith(("slowqueries.py", "middleware.py")):
+            return f"{frame.filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    try:
+        if connection.vendor == "postgresql":
+            prefix = connection.ops.explain_query_prefix(format="json")
+        else:
+            prefix = connection.ops.explain_query_prefix()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return [row[0] if len(row) == 1 else list(row) for row in cursor.fetchall()]
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        connection.close()
+
+
+class SlowQueryLog:
+    def __init__(self):
+        self.entries = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+        self.start()
+        # a worker forked from a preloaded parent would inherit a dead explain thread
+        os.register_at_fork(after_in_child=self.start)
+
+    def start(self):
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def add(self, entry, alias, params):
+        with self.lock:
+            self.entries.append(entry)
+
+        if entry["sql"].lstrip().upper().startswith("SELECT") and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE:
+            self.executor.submit(self.add_plan, entry, alias, params)
+
+    def add_plan(self, entry, alias, params):
+        entry["plan"] = explain(alias, entry["sql"], params)
+
+    def get_entries(self):
+        with self.lock:
+            return list(reversed(self.entries))
+
+
+slow_query_log = SlowQueryLog()
+
+
+class SlowQueryRecorder:
+    def __init__(self, view_name):
+        self.view_name = view_name
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - started
+            if duration >= settings.SLOW_QUERY_THRESHOLD and not many:
+                slow_query_log.add({
+                    "time": time.time(),
+                    "duration": round(duration, 4),
+                    "view": self.view_name,
+                    "frame": find_app_frame(),
+                    "sql": sql,
+                    "params": [str(param) for param in params or []],
+                }, context["connection"].alias, params)
@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from hunting import ratelimit
+from hunting.ratelimit import TokenBucketLimiter, get_client_id
+from hunting.views import parse_range
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_single_range(self):
+        self.assertEqual(parse_range("bytes=2-4", 10), (2, 4))
+        self.assertEqual(parse_range("bytes=7-", 10), (7, 9))
+        self.assertEqual(parse_range("bytes=-3", 10), (7, 9))
+        self.assertEqual(parse_range("bytes=5-100", 10), (5, 9))
+
+    def test_unsupported_header_is_ignored(self):
+        for header in ["", "bytes=0-1,4-5", "items=0-1", "bytes=-", "bytes=a-b"]:
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 10))
+
+    def test_unsatisfiable_range(self):
+        for header in ["bytes=20-30", "bytes=10-", "bytes=-0", "bytes=5-2"]:
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    parse_range(header, 10)
+
+
+class MediaViewRangeTests(SimpleTestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, "logos"))
+        with open(os.path.join(media_root, "logos", "file.txt"), "wb") as f:
+            f.write(b"0123456789")
+
+        media_settings = override_settings(MEDIA_ROOT=media_root, MEDIA_SERVE_MODE="python")
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def get(self, range_header=None):
+        headers = {"HTTP_RANGE": range_header} if range_header else {}
+        response = self.client.get("/media/logos/file.txt", **headers)
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_partial_content(self):
+        response, content = self.get("bytes=2-4")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(content, b"234")
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+
+    def test_multiple_ranges_get_the_whole_file(self):
+        response, content = self.get("bytes=0-1,4-5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, b"0123456789")
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get("bytes=20-30")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+        self.assertFalse(response.has_header("Cache-Control"))
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_cache_headers(self):
+        response, _ = self.get("bytes=2-4")
+        self.assertIn("max-age", response["Cache-Control"])
+
+        not_modified = self.client.get("/media/logos/file.txt", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        self.assertFalse(not_modified.has_header("Cache-Control"))
+
+
+def get_partner_key(request):
+    return f"partner:{request.headers.get('X-Partner')}"
+
+
+class ClientIdTests(SimpleTestCase):
+    def get_client_id(self, remote_addr, forwarded_for=None, **headers):
+        if forwarded_for:
+            headers["HTTP_X_FORWARDED_FOR"] = forwarded_for
+        request = RequestFactory().get("/", REMOTE_ADDR=remote_addr, **headers)
+        request.user = AnonymousUser()
+        return get_client_id(request)
+
+    def test_forwarded_for_is_ignored_without_trusted_proxies(self):
+        self.assertEqual(self.get_client_id("10.0.0.5", "1.2.3.4"), "ip:10.0.0.5")
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=["10.0.0.0/8"])
+    def test_client_behind_trusted_proxy(self):
+        self.assertEqual(self.get_client_id("10.0.0.5", "1.2.3.4"), "ip:1.2.3.4")
+        # the leftmost address comes from the client and can be forged
+        self.assertEqual(self.get_client_id("10.0.0.5", "6.6.6.6, 1.2.3.4, 10.0.0.9"), "ip:1.2.3.4")
+        self.assertEqual(self.get_client_id("10.0.0.5"), "ip:10.0.0.5")
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=["10.0.0.0/8"])
+    def test_untrusted_sender_cannot_pick_its_address(self):
+        self.assertEqual(self.get_client_id("8.8.8.8", "1.2.3.4"), "ip:8.8.8.8")
+
+    @override_settings(RATE_LIMIT_CLIENT_KEY="hunting.tests.get_partner_key")
+    def test_custom_client_key(self):
+        self.assertEqual(self.get_client_id("10.0.0.5", HTTP_X_PARTNER="acme"), "partner:acme")
+
+
+@override_settings(PROFILING_ENABLED=True)
+class ProfilingMiddlewareTests(TestCase):
+    def test_stats_sorted_by_known_key(self):
+        response = self.client.get("/vacancy/", {"__profile": "1", "__profile_sort": "time"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Ordered by: internal time", response.content)
+
+    def test_unknown_sort_key(self):
+        response = self.client.get("/vacancy/", {"__profile": "1", "__profile_sort": "bogus"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cumulative", response.json()["error"])
+
+
+class TokenBucketLimiterTests(SimpleTestCase):
+    def test_limits_after_burst(self):
+        limiter = TokenBucketLimiter()
+
+        waits = [limiter.take("client", 1, 3) for _ in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertGreater(waits[3], 0)
+
+    def test_refilled_buckets_are_dropped(self):
+        limiter = TokenBucketLimiter()
+        with mock.patch("hunting.ratelimit.time.monotonic", return_value=100):
+            limiter.take("old", 1, 2)
+        with mock.patch("hunting.ratelimit.time.monotonic", return_value=110):
+            limiter.take("new", 1, 2)
+
+        self.assertEqual(list(limiter.buckets), ["new"])
+
+    @override_settings(RATE_LIMIT_MAX_BUCKETS=3)
+    def test_bucket_count_is_bounded(self):
+        limiter = TokenBucketLimiter()
+
+        for address in range(10):
+            limiter.take(f"ip:{address}", 1, 2)
+
+        self.assertEqual(list(limiter.buckets), ["ip:7", "ip:8", "ip:9"])
+
+
+@override_settings(RATE_LIMITS={"vacancy_create": (0.001, 1), "vacancy_update": (0.001, 1), "vacancy_delete": (0.001, 1)})
+class WriteScopeTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ratelimit, "limiter", TokenBucketLimiter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_each_write_endpoint_has_its_own_bucket(self):
+        for _ in range(2):
+            self.client.post("/vacancy/create/", "{}", content_type="application/json")
+
+        create = self.client.post("/vacancy/create/", "{}", content_type="application/json")
+        update = self.client.post("/vacancy/1/update/", "{}", content_type="application/json")
+
+        self.assertEqual(create.status_code, 429)
+        self.assertEqual(update.status_code, 404)
@@ -13,17 +13,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.conf.urls.static import static
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
-from hunting import settings
+from hunting.views import MediaView, SlowQueryListView, MemoryProfileView
 
 urlpatterns = [
+    path('admin/slow-queries/', SlowQueryListView.as_view()),
+    path('admin/memory-profile/', MemoryProfileView.as_view()),
     path('admin/', admin.site.urls),
     path('vacancy/', include('vacancies.urls')),
     path('company/', include('companies.urls')),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', MediaView.as_view()),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
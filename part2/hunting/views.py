@@ -0,0 +1,141 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse, \
+    StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.utils.decorators import method_decorator
+from django.views import View
+
+from hunting.profiling import trace_allocations
+from hunting.slowqueries import slow_query_log
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+CHUNK_SIZE = 64 * 1024
+
+
+def read_file_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def parse_range(header, size):
+    # None means the header is ignored and the whole file is sent, as for other units,
+    # multiple ranges and malformed values; ValueError means the range cannot be satisfied
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class MediaView(View):
+    def get(self, request, path):
+        path = posixpath.normpath(path).lstrip("/")
+        if not path.startswith(tuple(settings.MEDIA_PUBLIC_DIRS)) and not request.user.is_staff:
+            raise Http404("Media file not found")
+
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+            stat = os.stat(full_path)
+        except (ValueError, OSError):
+            raise Http404("Media file not found")
+        if not os.path.isfile(full_path):
+            raise Http404("Media file not found")
+
+        content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        elif settings.MEDIA_SERVE_MODE == "x-accel-redirect":
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        elif settings.MEDIA_SERVE_MODE == "x-sendfile":
+            response = HttpResponse(content_type=content_type)
+            response["X-Sendfile"] = full_path
+        else:
+            response = self.file_response(request, full_path, stat.st_size, content_type)
+
+        # a 304 repeats the validator it matched, only file content is cached for a year
+        if response.status_code in (200, 206, 304):
+            response["ETag"] = etag
+        if response.status_code in (200, 206):
+            response["Last-Modified"] = http_date(stat.st_mtime)
+            response["Cache-Control"] = f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+        return response
+
+    def file_response(self, request, full_path, size, content_type):
+        try:
+            response_range = parse_range(request.headers.get("Range", ""), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        if response_range is None:
+            # FileResponse lets the WSGI server use wsgi.file_wrapper, i.e. os.sendfile
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+            response["Accept-Ranges"] = "bytes"
+            return response
+
+        start, end = response_range
+        response = StreamingHttpResponse(
+            read_file_range(full_path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class SlowQueryListView(View):
+    def get(self, request):
+        return JsonResponse({"items": slow_query_log.get_entries()})
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class MemoryProfileView(View):
+    def get(self, request):
+        url = request.GET.get("url")
+        if not url or not url.startswith("/"):
+            return JsonResponse({"error": "url must be a local path"}, status=400)
+
+        try:
+            requests = min(int(request.GET.get("requests", 50)), settings.MEMORY_PROFILE_MAX_REQUESTS)
+            limit = int(request.GET.get("limit", 20))
+        except ValueError:
+            return JsonResponse({"error": "requests and limit must be integers"}, status=400)
+
+        allocations = trace_allocations(url, requests, limit, host=request.get_host())
+        return JsonResponse({
+            "url": url,
+            "requests": requests,
+            "items": allocations,
+            "total_size_diff": sum(item["size_diff"] for item in allocations),
+        })
@@ -0,0 +1,22 @@
+"""
+WSGI entry point that warms the application up at import time.
+
+Meant for servers that import the application once and then fork workers,
+e.g. gunicorn with preload_app (see gunicorn.conf.py).
+"""
+
+import os
+import time
+
+started = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hunting.settings')
+
+application = get_wsgi_application()
+
+from hunting.preload import warm_up  # noqa: E402
+
+startup_timings = {"django_setup": round((time.perf_counter() - started) * 1000, 2)}
+startup_timings.update(warm_up())
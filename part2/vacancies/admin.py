@@ -1,6 +1,55 @@
 from django.contrib import admin
+from django.utils import timezone
 
+from hunting.cache import bump_namespace_version
+from hunting.paginator import EstimatedCountPaginator
+from vacancies.events import publish_vacancy_updates
 from vacancies.models import Vacancy, Skill
+from vacancies.views import VACANCY_CACHE
 
-admin.site.register(Vacancy)
-admin.site.register(Skill)
+
+@admin.register(Vacancy)
+class VacancyAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "slug", "user", "status", "is_archived", "created")
+    list_select_related = ("user",)
+    list_filter = ("status", "is_archived")
+    # served on PostgreSQL by the UPPER() indexes from migration 0015
+    search_fields = ("^name", "=slug")
+    autocomplete_fields = ("user", "skills")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ("archive", "unarchive", "open_vacancies", "close_vacancies")
+
+    def update_vacancies(self, request, queryset, message, **fields):
+        # queryset.update() skips auto_now and signals, so both are handled here;
+        # the ids are taken first, a list filter may no longer match the updated rows
+        vacancies = Vacancy.objects.filter(pk__in=list(queryset.values_list("pk", flat=True)))
+        updated = vacancies.update(updated_at=timezone.now(), **fields)
+        bump_namespace_version(VACANCY_CACHE)
+        publish_vacancy_updates(vacancies)
+        self.message_user(request, f"{updated} {message}")
+
+    @admin.action(description="Архивировать выбранные вакансии")
+    def archive(self, request, queryset):
+        self.update_vacancies(request, queryset, "vacancies archived", is_archived=True)
+
+    @admin.action(description="Вернуть выбранные вакансии из архива")
+    def unarchive(self, request, queryset):
+        self.update_vacancies(request, queryset, "vacancies unarchived", is_archived=False)
+
+    @admin.action(description="Открыть выбранные вакансии")
+    def open_vacancies(self, request, queryset):
+        self.update_vacancies(request, queryset, "vacancies opened", status="open")
+
+    @admin.action(description="Закрыть выбранные вакансии")
+    def close_vacancies(self, request, queryset):
+        self.update_vacancies(request, queryset, "vacancies closed", status="closed")
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ("id", "name")
+    search_fields = ("^name",)
+    ordering = ("name",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+VACANCY_EVENTS_CHANNEL = "vacancy_events"
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyEventBroker:
+    # fans vacancy events out to every stream connected to this process,
+    # on PostgreSQL one LISTEN connection per process feeds all of them
+    def __init__(self):
+        self.reset()
+        # a worker forked from a preloaded parent starts its own listener
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.listener = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(settings.VACANCY_STREAM_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[queue] = asyncio.get_running_loop()
+        self.ensure_listening()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            self.subscribers.pop(queue, None)
+
+    def publish(self, event):
+        self.publish_many([event])
+
+    def publish_many(self, events):
+        if not events:
+            return
+        if connection.vendor == "postgresql":
+            # NOTIFY is only delivered on commit, to the listeners of every process
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                    [VACANCY_EVENTS_CHANNEL, [json.dumps(event) for event in events]],
+                )
+        else:
+            transaction.on_commit(lambda: [self.dispatch(event) for event in events])
+
+    def dispatch(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.deliver, queue, event)
+            except RuntimeError:
+                # the loop of that stream is closed
+                self.unsubscribe(queue)
+
+    def deliver(self, queue, event):
+        if queue.full():
+            # a slow client loses the oldest event, it can catch up from /vacancy/changes/
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def ensure_listening(self):
+        if connection.vendor != "postgresql":
+            return
+        with self.lock:
+            if self.listener is not None:
+                return
+            self.listener = threading.Thread(target=self.listen, name="vacancy-events", daemon=True)
+        self.listener.start()
+
+    def listen(self):
+        while True:
+            db = connections.create_connection("default")
+            try:
+                db.ensure_connection()
+                db.set_autocommit(True)
+                with db.connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {VACANCY_EVENTS_CHANNEL}")
+                self.receive(db.connection)
+            except Exception:
+                logger.exception("Vacancy events listener lost its connection")
+                time.sleep(settings.VACANCY_STREAM_RECONNECT_DELAY)
+            finally:
+                db.close()
+
+    def receive(self, raw_connection):
+        while True:
+            ready, _, _ = select.select([raw_connection], [], [], settings.VACANCY_STREAM_HEALTH_CHECK_INTERVAL)
+            if not ready:
+                # a silently dropped connection never becomes readable, a query on it fails and reconnects
+                with raw_connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            raw_connection.poll()
+            while raw_connection.notifies:
+                notify = raw_connection.notifies.pop(0)
+                self.dispatch(json.loads(notify.payload))
+
+
+def vacancy_event(vacancy, created):
+    return {
+        "event": "created" if created else "updated",
+        "id": vacancy.pk,
+        "slug": vacancy.slug,
+        "name": vacancy.name,
+        "status": vacancy.status,
+        "updated_at": vacancy.updated_at.isoformat(),
+    }
+
+
+def publish_vacancy_updates(vacancies):
+    # queryset.update() sends no post_save, so the paths using it publish their rows here
+    vacancy_events.publish_many([
+        vacancy_event(vacancy, False) for vacancy in vacancies.only("slug", "name", "status", "updated_at")
+    ])
+
+
+vacancy_events = VacancyEventBroker()
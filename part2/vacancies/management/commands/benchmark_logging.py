@@ -0,0 +1,60 @@
+import copy
+import logging.config
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = "Compare request latency under the debug and production logging profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--url", default="/vacancy/")
+
+    def handle(self, *args, **options):
+        devnull = open(os.devnull, "w")
+        profiles = {
+            "debug": self.with_stream(settings.DEBUG_LOGGING, "console", devnull),
+            "production": self.with_stream(settings.PRODUCTION_LOGGING, "queue", devnull),
+        }
+
+        connection.force_debug_cursor = True
+        try:
+            for name, config in profiles.items():
+                logging.config.dictConfig(config)
+                timings = self.run_requests(options["url"], options["requests"])
+                self.report(name, timings)
+        finally:
+            connection.force_debug_cursor = False
+            logging.config.dictConfig(settings.LOGGING)
+            devnull.close()
+
+    def with_stream(self, config, handler, stream):
+        config = copy.deepcopy(config)
+        config["handlers"][handler]["stream"] = stream
+        return config
+
+    def run_requests(self, url, count):
+        client = Client()
+        client.get(url)
+
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def report(self, name, timings):
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{name:<12} mean {statistics.mean(timings):.2f} ms, "
+            f"p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms"
+        )
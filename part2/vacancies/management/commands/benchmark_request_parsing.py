@@ -0,0 +1,48 @@
+import json
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.forms import modelform_factory
+
+from hunting import schema
+from vacancies.models import Vacancy
+from vacancies.schemas import VACANCY_CREATE_SCHEMA
+
+SAMPLE_BODY = json.dumps({
+    "slug": "python-developer",
+    "text": "We are looking for a Python developer " * 20,
+    "status": "open",
+    "user_id": 1,
+    "skills": ["python", "django", "postgresql", "docker", "git"],
+}).encode()
+
+
+class Command(BaseCommand):
+    help = "Compare the request body parsing of the write views before and after the schema layer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        vacancy_form = modelform_factory(Vacancy, fields=["slug", "text", "status"])
+
+        def json_and_indexing():
+            data = json.loads(SAMPLE_BODY)
+            return data["slug"], data["text"], data["status"], data["user_id"], data["skills"]
+
+        def json_and_model_form():
+            form = vacancy_form(json.loads(SAMPLE_BODY))
+            return form.is_valid()
+
+        def schema_parse():
+            return VACANCY_CREATE_SCHEMA.parse(SAMPLE_BODY)
+
+        candidates = [
+            ("json.loads + indexing (no validation)", json_and_indexing, number),
+            ("json.loads + ModelForm", json_and_model_form, max(number // 10, 1)),
+            (f"schema ({'orjson' if schema.orjson else 'json'})", schema_parse, number),
+        ]
+        for name, func, runs in candidates:
+            seconds = min(timeit.repeat(func, number=runs, repeat=3)) / runs
+            self.stdout.write(f"{name:<40} {seconds * 1_000_000:8.2f} us per body")
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from vacancies.models import Vacancy
+
+INDEX_NAME = "vacancies_vacancy_created_brin"
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the last N days vacancy filter and fail unless it uses the BRIN index on created"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The BRIN index on created only exists on PostgreSQL")
+
+        created_from = timezone.now().date() - timedelta(days=options["days"])
+        queryset = Vacancy.objects.filter(created__gte=created_from).values("id", "name")
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE vacancies_vacancy")
+        plan = queryset.explain()
+        self.stdout.write(plan)
+
+        if INDEX_NAME not in plan:
+            raise CommandError(f"The plan does not use {INDEX_NAME}")
+        self.stdout.write(self.style.SUCCESS(f"The plan uses {INDEX_NAME}"))
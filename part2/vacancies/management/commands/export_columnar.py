@@ -0,0 +1,135 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from vacancies.models import Skill, UserVacancyStats, Vacancy
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def iter_chunks(queryset, fields, chunk_size):
+    # keyset pagination on pk, so every chunk is an index range scan
+    last_pk = None
+    while True:
+        chunk = queryset.order_by("pk")
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list("pk", *fields)[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield rows
+
+
+def dictionary_column(values, dictionary, positions):
+    indices = pa.array([positions[value] for value in values], type=pa.int32())
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+class Command(BaseCommand):
+    help = "Export vacancies, skills, vacancy-skill links and per-user counts to Parquet or Arrow IPC files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory the files are written to")
+        parser.add_argument("--format", choices=FORMATS, default="parquet")
+        parser.add_argument("--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if pa is None:
+            raise CommandError("export_columnar needs pyarrow, install it with `pip install pyarrow`")
+
+        self.output = options["output"]
+        self.format = options["format"]
+        self.chunk_size = options["chunk_size"]
+        os.makedirs(self.output, exist_ok=True)
+
+        snapshot = connection.vendor == "postgresql" and not connection.in_atomic_block
+        with transaction.atomic():
+            if snapshot:
+                # every table and dictionary is read from one snapshot, so no row can miss its dictionary entry
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            self.export_tables()
+
+    def export_tables(self):
+        skills = list(Skill.objects.order_by("pk").values_list("pk", "name"))
+        skill_names = pa.array([name for _, name in skills], type=pa.string())
+        skill_positions = {pk: position for position, (pk, _) in enumerate(skills)}
+        # statuses come from the rows, a value outside Vacancy.STATUS is exported as it is stored
+        statuses = list(Vacancy.objects.order_by("status").values_list("status", flat=True).distinct())
+        status_names = pa.array(statuses, type=pa.string())
+        status_positions = {status: position for position, status in enumerate(statuses)}
+
+        self.export("skills", pa.schema([
+            ("id", pa.int64()),
+            ("name", pa.string()),
+            ("vacancy_count", pa.int64()),
+        ]), Skill.objects.all(), ["name", "vacancy_count"], lambda ids, names, counts: [ids, names, counts])
+
+        self.export("vacancies", pa.schema([
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("slug", pa.string()),
+            ("name", pa.string()),
+            ("text", pa.string()),
+            ("status", pa.dictionary(pa.int32(), pa.string())),
+            ("created", pa.date32()),
+            ("updated_at", pa.timestamp("us", tz="UTC")),
+            ("is_archived", pa.bool_()),
+        ]), Vacancy.objects.all(), ["user_id", "slug", "name", "text", "status", "created", "updated_at", "is_archived"],
+            lambda ids, user_ids, slugs, names, texts, status, created, updated_at, is_archived: [
+                ids, user_ids, slugs, names, texts,
+                dictionary_column(status, status_names, status_positions),
+                created, updated_at, is_archived,
+            ])
+
+        self.export("vacancy_skills", pa.schema([
+            ("vacancy_id", pa.int64()),
+            ("skill_id", pa.int64()),
+            ("skill", pa.dictionary(pa.int32(), pa.string())),
+        ]), Vacancy.skills.through.objects.all(), ["vacancy_id", "skill_id"],
+            lambda ids, vacancy_ids, skill_ids: [
+                vacancy_ids, skill_ids, dictionary_column(skill_ids, skill_names, skill_positions),
+            ])
+
+        self.export("user_vacancy_counts", pa.schema([
+            ("user_id", pa.int64()),
+            ("username", pa.string()),
+            ("vacancies_count", pa.int64()),
+        ]), UserVacancyStats.objects.all(), ["user__username", "vacancies_count"],
+            lambda user_ids, usernames, counts: [user_ids, usernames, counts])
+
+    def export(self, name, schema, queryset, fields, build_columns):
+        # every table is written batch by batch, so memory stays at one chunk whatever the table size
+        started = time.perf_counter()
+        path = os.path.join(self.output, name + FORMATS[self.format])
+        if self.format == "parquet":
+            writer = pa.parquet.ParquetWriter(path, schema)
+            write = lambda batch: writer.write_table(pa.Table.from_batches([batch]))  # noqa: E731
+        else:
+            writer = pa.ipc.new_file(path, schema)
+            write = writer.write_batch
+
+        total = 0
+        try:
+            for rows in iter_chunks(queryset, fields, self.chunk_size):
+                columns = build_columns(*zip(*rows))
+                write(pa.RecordBatch.from_arrays([
+                    column if isinstance(column, pa.Array) else pa.array(column, type=field.type)
+                    for column, field in zip(columns, schema)
+                ], schema=schema))
+                total += len(rows)
+        finally:
+            writer.close()
+
+        self.stdout.write(f"{name}: {total} rows to {path} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vacancies.stats import find_user_stats_mismatches, rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user vacancy counters, or only check them with --check"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Report mismatched counters without fixing them")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = find_user_stats_mismatches()
+            for user_id, (stored, expected) in sorted(mismatches.items()):
+                self.stdout.write(f"user {user_id}: stored {stored}, expected {expected}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} user counters are out of date")
+
+            self.stdout.write(self.style.SUCCESS("User vacancy stats are consistent"))
+            return
+
+        users = rebuild_user_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt vacancy stats for {users} users"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vacancies.stats import reconcile_skill_counts
+
+
+class Command(BaseCommand):
+    help = "Recount Skill.vacancy_count from the vacancy-skill links and fix the rows that drifted"
+
+    def handle(self, *args, **options):
+        fixed = reconcile_skill_counts()
+        self.stdout.write(self.style.SUCCESS(f"Fixed vacancy_count on {fixed} skills"))
@@ -0,0 +1,272 @@
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.signals import got_request_exception
+from django.db import connection
+from django.db.models import Q
+
+from vacancies.models import Skill, Vacancy
+
+DEFAULT_MIX = "list=60,detail=25,create=5,update=8,delete=2"
+
+PG_LOCK_WAITS_SQL = """
+    SELECT waiting.mode, COALESCE(waiting.relation::regclass::text, waiting.locktype), COUNT(*)
+    FROM pg_locks waiting
+    WHERE NOT waiting.granted
+    GROUP BY 1, 2
+"""
+
+PG_DEADLOCKS_SQL = "SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.exceptions = Counter()
+
+    def record(self, operation, status, latency):
+        with self.lock:
+            self.latencies[operation].append(latency)
+            self.statuses[operation][status] += 1
+
+    def record_exception(self, sender, request=None, **kwargs):
+        exc_type = sys.exc_info()[0]
+        with self.lock:
+            self.exceptions[exc_type.__name__ if exc_type else "unknown"] += 1
+
+    def take(self):
+        with self.lock:
+            latencies, statuses = self.latencies, self.statuses
+            self.latencies, self.statuses = defaultdict(list), defaultdict(Counter)
+        return latencies, statuses
+
+
+class Command(BaseCommand):
+    help = "Run a mixed read/write load against the vacancy endpoints and report latency, errors and lock waits"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default=None, help="Target server, by default one is started in-process")
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=60, help="Seconds to run")
+        parser.add_argument("--interval", type=float, default=10, help="Seconds between progress reports")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights, default {DEFAULT_MIX}")
+        parser.add_argument("--skills", default="python,django,sql,go,docker", help="Skill names used by writes")
+        parser.add_argument("--keep-limits", action="store_true", help="Keep RATE_LIMITS for the in-process server")
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options["mix"])
+        self.skills = options["skills"].split(",")
+        self.stats = Stats()
+        self.stopped = threading.Event()
+
+        user, self.created_user = User.objects.get_or_create(username="soak_test")
+        self.user_id = user.id
+        # existing vacancies are only read, updates and deletes stay on the ones this run created
+        self.read_ids = list(Vacancy.objects.values_list("id", flat=True)[:10000])
+        self.ids = []
+        self.existing_skills = set(Skill.objects.filter(name__in=self.skills).values_list("name", flat=True))
+        self.ids_lock = threading.Lock()
+
+        server = None
+        base_url = options["base_url"]
+        if base_url is None:
+            server, base_url = self.start_server(options["keep_limits"])
+        self.base_url = base_url.rstrip("/")
+
+        deadlocks_before = self.count_deadlocks()
+        lock_waits = Counter()
+        workers = [threading.Thread(target=self.work, args=(mix,), daemon=True) for _ in range(options["threads"])]
+        for worker in workers:
+            worker.start()
+
+        started = time.monotonic()
+        next_report = started + options["interval"]
+        total_latencies, total_statuses = defaultdict(list), defaultdict(Counter)
+        try:
+            while time.monotonic() - started < options["duration"]:
+                time.sleep(1)
+                lock_waits.update(self.sample_lock_waits())
+                if time.monotonic() >= next_report or time.monotonic() - started >= options["duration"]:
+                    latencies, statuses = self.stats.take()
+                    self.report(f"t={time.monotonic() - started:.0f}s", latencies, statuses, options["interval"])
+                    for operation in latencies:
+                        total_latencies[operation] += latencies[operation]
+                        total_statuses[operation].update(statuses[operation])
+                    next_report += options["interval"]
+        finally:
+            self.stopped.set()
+            for worker in workers:
+                worker.join()
+            if server is not None:
+                server.shutdown()
+                got_request_exception.disconnect(self.stats.record_exception)
+            self.clean_up()
+
+        latencies, statuses = self.stats.take()
+        for operation in latencies:
+            total_latencies[operation] += latencies[operation]
+            total_statuses[operation].update(statuses[operation])
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Summary"))
+        self.report("total", total_latencies, total_statuses, time.monotonic() - started)
+        self.report_database(deadlocks_before, lock_waits)
+
+    def parse_mix(self, mix):
+        weights = {}
+        try:
+            for item in mix.split(","):
+                operation, weight = item.split("=")
+                weights[operation.strip()] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid --mix: {mix}")
+
+        unknown = set(weights) - {"list", "detail", "create", "update", "delete"}
+        if unknown:
+            raise CommandError(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+        return weights
+
+    def start_server(self, keep_limits):
+        if not keep_limits:
+            settings.RATE_LIMITS = {scope: (1e9, 1e9) for scope in settings.RATE_LIMITS}
+
+        got_request_exception.connect(self.stats.record_exception)
+        server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler)
+        server.daemon_threads = True
+        server.set_app(WSGIHandler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_port}"
+
+    def work(self, mix):
+        operations, weights = list(mix), list(mix.values())
+        while not self.stopped.is_set():
+            operation = random.choices(operations, weights)[0]
+            getattr(self, f"run_{operation}")()
+
+    def call(self, operation, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, b""
+        except OSError:
+            status, content = "connection error", b""
+
+        self.stats.record(operation, status, time.perf_counter() - started)
+        return status, content
+
+    def random_id(self):
+        with self.ids_lock:
+            return random.choice(self.ids) if self.ids else None
+
+    def random_read_id(self):
+        with self.ids_lock:
+            ids = self.read_ids + self.ids
+        return random.choice(ids) if ids else None
+
+    def clean_up(self):
+        # runs in the same database as the server, deleting through the ORM keeps the counters in step
+        _, deleted = Vacancy.objects.filter(Q(user_id=self.user_id) | Q(slug__startswith="soak-test-")).delete()
+        Skill.objects.filter(name__in=self.skills).exclude(name__in=self.existing_skills).delete()
+        if self.created_user:
+            User.objects.filter(pk=self.user_id).delete()
+        self.stdout.write(f"Removed {deleted.get('vacancies.Vacancy', 0)} soak test vacancies")
+
+    def vacancy_body(self):
+        return {
+            "slug": f"soak-test-{uuid.uuid4().hex[:12]}",
+            "text": "soak test vacancy",
+            "status": random.choice(["draft", "open", "closed"]),
+            "user_id": self.user_id,
+            "skills": random.sample(self.skills, k=min(2, len(self.skills))),
+        }
+
+    def run_list(self):
+        self.call("list", "GET", f"/vacancy/?page={random.randint(1, 5)}")
+
+    def run_detail(self):
+        vacancy_id = self.random_read_id()
+        if vacancy_id is not None:
+            self.call("detail", "GET", f"/vacancy/{vacancy_id}/")
+
+    def run_create(self):
+        status, content = self.call("create", "POST", "/vacancy/create/", self.vacancy_body())
+        if status == 200:
+            with self.ids_lock:
+                self.ids.append(json.loads(content)["id"])
+
+    def run_update(self):
+        vacancy_id = self.random_id()
+        if vacancy_id is not None:
+            self.call("update", "POST", f"/vacancy/{vacancy_id}/update/", self.vacancy_body())
+
+    def run_delete(self):
+        with self.ids_lock:
+            vacancy_id = self.ids.pop(random.randrange(len(self.ids))) if self.ids else None
+        if vacancy_id is not None:
+            self.call("delete", "DELETE", f"/vacancy/{vacancy_id}/delete/")
+
+    def report(self, label, latencies, statuses, seconds):
+        self.stdout.write(label)
+        for operation in sorted(latencies):
+            timings = sorted(latencies[operation])
+            p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+            codes = ", ".join(f"{status}: {count}" for status, count in sorted(statuses[operation].items(), key=str))
+            self.stdout.write(
+                f"  {operation:<7} {len(timings) / seconds:8.1f} req/s  "
+                f"p50 {statistics.median(timings) * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  "
+                f"max {timings[-1] * 1000:7.1f} ms  [{codes}]"
+            )
+
+    def count_deadlocks(self):
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(PG_DEADLOCKS_SQL)
+            return cursor.fetchone()[0]
+
+    def sample_lock_waits(self):
+        if connection.vendor != "postgresql":
+            return Counter()
+        with connection.cursor() as cursor:
+            cursor.execute(PG_LOCK_WAITS_SQL)
+            return Counter({(mode, relation): count for mode, relation, count in cursor.fetchall()})
+
+    def report_database(self, deadlocks_before, lock_waits):
+        if self.stats.exceptions:
+            self.stdout.write("Server exceptions:")
+            for name, count in self.stats.exceptions.most_common():
+                self.stdout.write(f"  {name}: {count}")
+
+        if connection.vendor != "postgresql":
+            self.stdout.write("Lock waits and deadlocks are only reported for PostgreSQL")
+            return
+
+        self.stdout.write(f"Deadlocks: {self.count_deadlocks() - deadlocks_before}")
+        self.stdout.write("Lock waits seen in pg_locks (sampled every second):")
+        for (mode, relation), count in lock_waits.most_common(20):
+            self.stdout.write(f"  {relation} {mode}: {count}")
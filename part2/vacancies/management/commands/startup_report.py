@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+REPORT_SCRIPT = "import json, hunting.wsgi_preload as w; print(json.dumps(w.startup_timings))"
+
+
+class Command(BaseCommand):
+    help = "Start the preloaded application in a fresh interpreter and report import and warm-up times"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20, help="Number of packages to list")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "hunting.settings"))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", REPORT_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+
+        packages = self.parse_importtime(result.stderr)
+        total = sum(packages.values())
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Imports: {total / 1000:.1f} ms"))
+        for package, microseconds in sorted(packages.items(), key=lambda item: -item[1])[:options["top"]]:
+            self.stdout.write(f"  {package:<30} {microseconds / 1000:8.1f} ms")
+
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(self.style.MIGRATE_HEADING("Startup phases"))
+        for phase, milliseconds in timings.items():
+            self.stdout.write(f"  {phase:<30} {milliseconds:8.1f} ms")
+
+    def parse_importtime(self, output):
+        # "import time: self [us] | cumulative | imported package", self times
+        # are summed per top-level package so nested imports are not counted twice
+        packages = defaultdict(int)
+        for line in output.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            own, _, name = line[len("import time:"):].split("|")
+            packages[name.strip().split(".")[0]] += int(own)
+        return packages
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hunting.profiling import trace_allocations
+
+
+class Command(BaseCommand):
+    help = "Report the top allocation sites that grew over N requests to a URL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--fail-above", type=int, default=None,
+            help="Exit with an error when the top sites grew by more than this many bytes in total",
+        )
+
+    def handle(self, *args, **options):
+        allocations = trace_allocations(options["url"], options["requests"], options["limit"])
+
+        for item in allocations:
+            self.stdout.write(
+                f"{item['file']}:{item['line']}: {item['size_diff']:+d} B "
+                f"({item['count_diff']:+d} blocks), {item['size']} B total"
+            )
+
+        total = sum(item["size_diff"] for item in allocations)
+        self.stdout.write(f"Total growth of the top {len(allocations)} sites: {total:+d} B")
+
+        if options["fail_above"] is not None and total > options["fail_above"]:
+            raise CommandError(f"Memory grew by {total} B, more than {options['fail_above']} B")
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+
+from hunting.compression import get_supported_encodings
+from vacancies.models import Vacancy
+from vacancies.popularity import view_counter
+
+
+class Command(BaseCommand):
+    help = "Pre-render the first vacancy list pages and the most viewed vacancies into the response cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=10)
+        parser.add_argument("--details", type=int, default=100)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--host", default="localhost")
+
+    def handle(self, *args, **options):
+        vacancy_ids = view_counter.top(options["details"])
+        if len(vacancy_ids) < options["details"]:
+            # nothing recorded yet, e.g. after a cache flush: fall back to the newest vacancies
+            newest = Vacancy.objects.exclude(id__in=vacancy_ids).order_by("-updated_at").values_list("id", flat=True)
+            vacancy_ids += list(newest[:options["details"] - len(vacancy_ids)])
+
+        # the cache key keeps the query string, so the bare first page is a key of its own
+        urls = ["/vacancy/"]
+        urls += [f"/vacancy/?page={page}" for page in range(1, options["pages"] + 1)]
+        urls += [f"/vacancy/{vacancy_id}/" for vacancy_id in vacancy_ids]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            statuses = list(executor.map(lambda url: self.warm(url, options["host"]), urls))
+
+        failed = [url for url, status in zip(urls, statuses) if status != 200]
+        for url in failed:
+            self.stderr.write(f"Could not warm {url}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {len(urls) - len(failed)} of {len(urls)} responses in {time.perf_counter() - started:.2f}s"
+        ))
+
+    def warm(self, url, host):
+        client = Client(HTTP_HOST=host)
+        try:
+            status = client.get(url).status_code
+            # store the compressed variants too, so the first real hit does not compress
+            for encoding in get_supported_encodings():
+                client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            return status
+        finally:
+            connections.close_all()
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.7 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0008_auto_20220126_1841'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vacancy_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Удалённая вакансия',
+                'verbose_name_plural': 'Удалённые вакансии',
+            },
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='created',
+            field=models.DateField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='slug',
+            field=models.SlugField(),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.7 on 2026-10-19 12:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_user_stats(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    UserVacancyStats = apps.get_model('vacancies', 'UserVacancyStats')
+
+    users_qs = User.objects.annotate(vacancies=models.Count('vacancy')).filter(vacancies__gt=0)
+    UserVacancyStats.objects.bulk_create(
+        [UserVacancyStats(user_id=user_id, vacancies_count=count) for user_id, count in users_qs.values_list('id', 'vacancies')],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('vacancies', '0009_auto_20261019_1200'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserVacancyStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vacancy_stats', serialize=False, to='auth.user')),
+                ('vacancies_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Статистика вакансий пользователя',
+                'verbose_name_plural': 'Статистика вакансий пользователей',
+            },
+        ),
+        migrations.RunPython(fill_user_stats, migrations.RunPython.noop),
+    ]
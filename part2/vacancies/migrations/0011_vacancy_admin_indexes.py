@@ -0,0 +1,21 @@
+# Generated by Django 3.2.7 on 2026-10-19 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0010_uservacancystats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['name'], name='vacancies_v_name_07c2b1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['status', 'is_archived'], name='vacancies_v_status_d0b232_idx'),
+        ),
+    ]
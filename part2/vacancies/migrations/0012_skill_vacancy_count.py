@@ -0,0 +1,31 @@
+# Generated by Django 3.2.7 on 2026-10-19 15:16
+
+from django.db import migrations, models
+
+
+def fill_vacancy_count(apps, schema_editor):
+    Skill = apps.get_model('vacancies', 'Skill')
+
+    for skill_id, count in Skill.objects.annotate(total=models.Count('vacancy')).values_list('id', 'total').iterator():
+        if count:
+            Skill.objects.filter(pk=skill_id).update(vacancy_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0011_vacancy_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='vacancy_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['-vacancy_count', 'id'], name='vacancies_s_vacancy_cacf13_idx'),
+        ),
+        migrations.RunPython(fill_vacancy_count, migrations.RunPython.noop),
+    ]
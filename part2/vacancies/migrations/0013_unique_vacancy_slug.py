@@ -0,0 +1,40 @@
+# Generated by Django 3.2.7 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+def resolve_slug_collisions(apps, schema_editor):
+    Vacancy = apps.get_model('vacancies', 'Vacancy')
+
+    duplicated = (
+        Vacancy.objects.values('slug')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+        .values_list('slug', flat=True)
+    )
+    for slug in list(duplicated):
+        # the oldest vacancy keeps the slug, the others get their id appended,
+        # plus a counter while that is taken by another vacancy already
+        for vacancy in Vacancy.objects.filter(slug=slug).order_by('id')[1:]:
+            suffix, attempt = f'-{vacancy.id}', 1
+            while Vacancy.objects.filter(slug=slug[:50 - len(suffix)] + suffix).exists():
+                attempt += 1
+                suffix = f'-{vacancy.id}-{attempt}'
+            vacancy.slug = slug[:50 - len(suffix)] + suffix
+            vacancy.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0012_skill_vacancy_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_slug_collisions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='slug',
+            field=models.SlugField(unique=True),
+        ),
+    ]
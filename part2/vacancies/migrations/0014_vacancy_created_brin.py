@@ -0,0 +1,27 @@
+# Generated by Django 3.2.7 on 2026-10-19 15:30
+
+from django.db import migrations
+
+INDEX_NAME = 'vacancies_vacancy_created_brin'
+
+
+def create_brin_index(apps, schema_editor):
+    # BRIN only exists on PostgreSQL, other backends (e.g. SQLite in tests) go without
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON vacancies_vacancy USING brin (created)')
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0013_unique_vacancy_slug'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
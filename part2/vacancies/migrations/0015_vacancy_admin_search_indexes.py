@@ -0,0 +1,34 @@
+# Generated by Django 3.2.7 on 2026-10-20 10:30
+
+from django.db import migrations
+
+# the admin searches with "^name" and "=slug", which PostgreSQL runs as
+# UPPER(name::text) LIKE UPPER(...) and UPPER(slug::text) = UPPER(...),
+# the plain indexes on name and slug cannot serve either
+INDEXES = {
+    'vacancies_vacancy_name_upper_like': 'UPPER(name) text_pattern_ops',
+    'vacancies_vacancy_slug_upper': 'UPPER(slug)',
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for name, expression in INDEXES.items():
+            schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON vacancies_vacancy ({expression})')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for name in INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0014_vacancy_created_brin'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.7 on 2026-10-20 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0015_vacancy_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['created', 'id'], name='vacancies_v_created_88fbc2_idx'),
+        ),
+    ]
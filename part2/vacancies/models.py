@@ -1,13 +1,29 @@
+from datetime import date
+
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+
+
+def check_date_not_past(value: date):
+    if value < date.today():
+        raise ValidationError(
+            "%(value)s is in the past",
+            params={"value": value},
+        )
 
 
 class Skill(models.Model):
     name = models.CharField(max_length=20)
+    vacancy_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name = "Навык"
         verbose_name_plural = "Навыки"
+        indexes = [
+            models.Index(fields=["-vacancy_count", "id"]),
+        ]
 
     def __str__(self):
         return self.name
@@ -17,11 +33,12 @@ class Vacancy(models.Model):
     STATUS = [("draft", "Черновик"), ("open", "Открыта"), ("closed", "Closed")]
 
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    slug = models.SlugField(max_length=50)
+    slug = models.SlugField(max_length=50, unique=True)
     name = models.CharField(max_length=50, null=True)
     text = models.CharField(max_length=1000)
     status = models.CharField(max_length=10, choices=STATUS, default="draft")
     created = models.DateField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_archived = models.BooleanField(default=False)
     skills = models.ManyToManyField(Skill)
 
@@ -30,3 +47,40 @@ class Vacancy(models.Model):
         verbose_name_plural = "Вакансии"
 
         ordering = ['name']
+        indexes = [
+            models.Index(fields=["name"]),
+            models.Index(fields=["status", "is_archived"]),
+            # ?ordering=created/-created with the id tie-breaker, which the BRIN index on created cannot sort
+            models.Index(fields=["created", "id"]),
+        ]
+
+    def __str__(self):
+        return self.name or self.slug
+
+    def save(self, *args, **kwargs):
+        # auto_now only writes updated_at when it is among the saved fields, which it is not
+        # for update_fields saves or instances loaded without it, the changes feed needs it
+        update_fields = kwargs.get("update_fields")
+        if update_fields:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+        elif update_fields is None and "updated_at" in self.get_deferred_fields():
+            self.updated_at = timezone.now()
+        super().save(*args, **kwargs)
+
+
+class VacancyTombstone(models.Model):
+    vacancy_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Удалённая вакансия"
+        verbose_name_plural = "Удалённые вакансии"
+
+
+class UserVacancyStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="vacancy_stats")
+    vacancies_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Статистика вакансий пользователя"
+        verbose_name_plural = "Статистика вакансий пользователей"
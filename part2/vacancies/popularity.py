@@ -0,0 +1,43 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+HOT_VACANCIES_KEY = "vacancies:hot"
+
+
+class ViewCounter:
+    # counts detail views in process and merges them into a shared top list
+    # every HOT_VACANCIES_FLUSH_EVERY views, the cache warm-up reads that list
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.pending = 0
+
+    def hit(self, vacancy_id):
+        with self.lock:
+            self.counts[vacancy_id] += 1
+            self.pending += 1
+            if self.pending < settings.HOT_VACANCIES_FLUSH_EVERY:
+                return
+            counts, self.counts, self.pending = self.counts, Counter(), 0
+        self.merge(counts)
+
+    def merge(self, counts):
+        hot = Counter(cache.get(HOT_VACANCIES_KEY, {}))
+        hot.update(counts)
+        cache.set(HOT_VACANCIES_KEY, dict(hot.most_common(settings.HOT_VACANCIES_SIZE)), None)
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts, self.pending = self.counts, Counter(), 0
+        if counts:
+            self.merge(counts)
+
+    def top(self, limit):
+        self.flush()
+        return [vacancy_id for vacancy_id, _ in Counter(cache.get(HOT_VACANCIES_KEY, {})).most_common(limit)]
+
+
+view_counter = ViewCounter()
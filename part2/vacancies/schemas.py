@@ -0,0 +1,25 @@
+from hunting.schema import Choice, Integer, List, Schema, String
+from vacancies.models import Vacancy
+
+SLUG_PATTERN = r"[-a-zA-Z0-9_]+"
+
+STATUSES = [status for status, _ in Vacancy.STATUS]
+
+VACANCY_CREATE_SCHEMA = Schema({
+    "slug": String(max_length=50, pattern=SLUG_PATTERN),
+    "text": String(max_length=1000),
+    "status": Choice(STATUSES),
+    "user_id": Integer(min_value=1),
+    "skills": List(String(min_length=1, max_length=20), max_items=50, default=list),
+})
+
+VACANCY_UPDATE_SCHEMA = Schema({
+    "slug": String(max_length=50, pattern=SLUG_PATTERN),
+    "text": String(max_length=1000),
+    "status": Choice(STATUSES),
+    "skills": List(String(min_length=1, max_length=20), max_items=50, default=list),
+})
+
+VACANCY_IDS_SCHEMA = Schema({
+    "ids": List(Integer(min_value=1)),
+})
@@ -0,0 +1,178 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from hunting.cache import bump_namespace_version
+from vacancies.events import publish_vacancy_updates, vacancy_event, vacancy_events
+from vacancies.models import Vacancy, VacancyTombstone, Skill
+from vacancies.similarity import skill_index
+from vacancies.slugs import slug_cache
+from vacancies.stats import change_user_vacancies_count, change_skill_vacancy_counts
+from vacancies.users import user_cache
+from vacancies.views import VACANCY_CACHE
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def touch_vacancy_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        vacancies = Vacancy.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        vacancies = Vacancy.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        vacancies = Vacancy.objects.filter(skills=instance)
+    else:
+        return
+
+    vacancies.update(updated_at=timezone.now())
+    publish_vacancy_updates(vacancies)
+
+
+@receiver(pre_delete, sender=User)
+def touch_vacancies_on_user_delete(sender, instance, **kwargs):
+    vacancies = Vacancy.objects.filter(user=instance)
+    vacancies.update(updated_at=timezone.now())
+    publish_vacancy_updates(vacancies)
+
+
+@receiver(pre_delete, sender=Skill)
+def touch_vacancies_on_skill_delete(sender, instance, **kwargs):
+    # the links go with the skill without m2m_changed, the vacancies still changed
+    vacancies = Vacancy.objects.filter(skills=instance)
+    vacancies.update(updated_at=timezone.now())
+    publish_vacancy_updates(vacancies)
+
+
+@receiver(post_delete, sender=Vacancy)
+def create_vacancy_tombstone(sender, instance, **kwargs):
+    VacancyTombstone.objects.create(vacancy_id=instance.pk)
+
+
+@receiver(post_init, sender=Vacancy)
+def remember_vacancy_user(sender, instance, **kwargs):
+    # read from __dict__, touching a deferred field would load it with one query per row
+    instance._stats_user_id = instance.__dict__.get("user_id", DEFERRED)
+    instance._loaded_slug = instance.__dict__.get("slug")
+
+
+@receiver(pre_save, sender=Vacancy)
+def load_previous_vacancy_user(sender, instance, **kwargs):
+    # user_id was deferred on load but has been assigned since, so look up what it was
+    if instance._stats_user_id is DEFERRED and "user_id" in instance.__dict__ and instance.pk is not None:
+        instance._stats_user_id = Vacancy.objects.filter(pk=instance.pk).values_list("user_id", flat=True).first()
+
+
+@receiver(post_save, sender=Vacancy)
+def update_user_stats_on_save(sender, instance, created, **kwargs):
+    previous_user_id = None if created else instance._stats_user_id
+    if previous_user_id is DEFERRED:
+        # user_id was neither loaded nor assigned, so this save did not change it
+        return
+    if previous_user_id != instance.user_id:
+        change_user_vacancies_count(previous_user_id, -1)
+        change_user_vacancies_count(instance.user_id, 1)
+
+    instance._stats_user_id = instance.user_id
+
+
+@receiver(post_delete, sender=Vacancy)
+def update_user_stats_on_delete(sender, instance, **kwargs):
+    change_user_vacancies_count(instance.user_id, -1)
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def update_skill_index(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        change = skill_index.add
+    elif action == "post_remove":
+        change = skill_index.remove
+    elif action == "pre_clear" and reverse:
+        transaction.on_commit(lambda: skill_index.remove_skill(instance.pk))
+        return
+    elif action == "post_clear" and not reverse:
+        transaction.on_commit(lambda: skill_index.remove_vacancy(instance.pk))
+        return
+    else:
+        return
+
+    if reverse:
+        transaction.on_commit(lambda: [change(vacancy_id, [instance.pk]) for vacancy_id in pk_set])
+    else:
+        transaction.on_commit(lambda: change(instance.pk, pk_set))
+
+
+@receiver(post_delete, sender=Vacancy)
+def remove_vacancy_from_skill_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: skill_index.remove_vacancy(instance.pk))
+
+
+@receiver(post_delete, sender=Skill)
+def remove_skill_from_skill_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: skill_index.remove_skill(instance.pk))
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def update_skill_vacancy_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        # pk_set may list skills that were never linked, so count real links first
+        links = sender.objects.filter(**{"skill_id" if reverse else "vacancy_id": instance.pk})
+        if action == "pre_remove":
+            links = links.filter(**{"vacancy_id__in" if reverse else "skill_id__in": pk_set})
+        instance._removed_skill_ids = list(links.values_list("skill_id", flat=True))
+    elif action in ("post_remove", "post_clear"):
+        removed = Counter(instance.__dict__.pop("_removed_skill_ids", []))
+        change_skill_vacancy_counts({skill_id: -count for skill_id, count in removed.items()})
+    elif action == "post_add":
+        if reverse:
+            change_skill_vacancy_counts({instance.pk: len(pk_set)})
+        else:
+            change_skill_vacancy_counts({skill_id: 1 for skill_id in pk_set})
+
+
+@receiver(pre_delete, sender=Vacancy)
+def update_skill_vacancy_counts_on_delete(sender, instance, **kwargs):
+    skill_ids = Vacancy.skills.through.objects.filter(vacancy_id=instance.pk).values_list("skill_id", flat=True)
+    change_skill_vacancy_counts({skill_id: -1 for skill_id in skill_ids})
+
+
+@receiver(post_save, sender=Vacancy)
+def invalidate_slug_cache_on_save(sender, instance, **kwargs):
+    slug_cache.invalidate(instance._loaded_slug, instance.slug)
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_delete, sender=Vacancy)
+def invalidate_slug_cache_on_delete(sender, instance, **kwargs):
+    slug_cache.invalidate(instance.slug)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Vacancy)
+def publish_vacancy_event(sender, instance, created, **kwargs):
+    vacancy_events.publish(vacancy_event(instance, created))
+
+
+@receiver(post_save, sender=Vacancy)
+@receiver(post_delete, sender=Vacancy)
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_vacancy_cache(sender, **kwargs):
+    if not kwargs.get("action", "post_").startswith("post_"):
+        return
+    # logins only touch last_login, which no vacancy response shows
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+
+    bump_namespace_version(VACANCY_CACHE)
@@ -0,0 +1,135 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from vacancies.models import Vacancy, VacancyTombstone
+
+
+def remove_sorted(values, value):
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        del values[position]
+
+
+class SkillIndex:
+    # skill id -> sorted array of vacancy ids, plus the reverse mapping,
+    # so similar vacancies are found without a self-join on the through table
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.vacancies_by_skill = None
+        self.skills_by_vacancy = None
+        self.synced_at = None
+        self.checked_at = 0
+
+    def load(self):
+        started = timezone.now()
+        vacancies_by_skill = {}
+        skills_by_vacancy = {}
+        through_rows = Vacancy.skills.through.objects.order_by("vacancy_id").values_list("vacancy_id", "skill_id")
+        for vacancy_id, skill_id in through_rows.iterator(chunk_size=10000):
+            vacancies_by_skill.setdefault(skill_id, array("q")).append(vacancy_id)
+            skills_by_vacancy.setdefault(vacancy_id, array("q")).append(skill_id)
+
+        for skill_ids in skills_by_vacancy.values():
+            skill_ids[:] = array("q", sorted(skill_ids))
+
+        self.vacancies_by_skill = vacancies_by_skill
+        self.skills_by_vacancy = skills_by_vacancy
+        self.synced_at = started
+        self.checked_at = time.monotonic()
+
+    def ensure_loaded(self):
+        with self.lock:
+            if self.vacancies_by_skill is None:
+                self.load()
+            elif time.monotonic() - self.checked_at >= settings.SKILL_INDEX_SYNC_INTERVAL:
+                self.sync()
+
+    def sync(self):
+        # picks up what other workers changed from the rows the changes feed reads:
+        # skill changes touch updated_at and deletes leave tombstones, the overlap
+        # covers transactions that committed after a newer one was already seen
+        started = timezone.now()
+        since = self.synced_at - timedelta(seconds=settings.SKILL_INDEX_SYNC_OVERLAP)
+
+        for vacancy_id in VacancyTombstone.objects.filter(deleted_at__gt=since).values_list("vacancy_id", flat=True):
+            self.unlink_vacancy(vacancy_id)
+
+        changed_ids = list(Vacancy.objects.filter(updated_at__gt=since).values_list("id", flat=True))
+        if changed_ids:
+            through_rows = Vacancy.skills.through.objects.filter(vacancy_id__in=changed_ids)
+            skills = {}
+            for vacancy_id, skill_id in through_rows.values_list("vacancy_id", "skill_id"):
+                skills.setdefault(vacancy_id, []).append(skill_id)
+            for vacancy_id in changed_ids:
+                self.unlink_vacancy(vacancy_id)
+                for skill_id in skills.get(vacancy_id, []):
+                    self.link(vacancy_id, skill_id)
+
+        self.synced_at = started
+        self.checked_at = time.monotonic()
+
+    def link(self, vacancy_id, skill_id):
+        vacancy_ids = self.vacancies_by_skill.setdefault(skill_id, array("q"))
+        position = bisect_left(vacancy_ids, vacancy_id)
+        if position == len(vacancy_ids) or vacancy_ids[position] != vacancy_id:
+            vacancy_ids.insert(position, vacancy_id)
+            insort(self.skills_by_vacancy.setdefault(vacancy_id, array("q")), skill_id)
+
+    def unlink(self, vacancy_id, skill_id):
+        remove_sorted(self.vacancies_by_skill.get(skill_id, array("q")), vacancy_id)
+        remove_sorted(self.skills_by_vacancy.get(vacancy_id, array("q")), skill_id)
+
+    def unlink_vacancy(self, vacancy_id):
+        for skill_id in list(self.skills_by_vacancy.pop(vacancy_id, [])):
+            remove_sorted(self.vacancies_by_skill.get(skill_id, array("q")), vacancy_id)
+
+    def add(self, vacancy_id, skill_ids):
+        with self.lock:
+            if self.vacancies_by_skill is not None:
+                for skill_id in skill_ids:
+                    self.link(vacancy_id, skill_id)
+
+    def remove(self, vacancy_id, skill_ids):
+        with self.lock:
+            if self.vacancies_by_skill is not None:
+                for skill_id in skill_ids:
+                    self.unlink(vacancy_id, skill_id)
+
+    def remove_vacancy(self, vacancy_id):
+        with self.lock:
+            if self.vacancies_by_skill is not None:
+                self.unlink_vacancy(vacancy_id)
+
+    def remove_skill(self, skill_id):
+        with self.lock:
+            if self.vacancies_by_skill is not None:
+                for vacancy_id in list(self.vacancies_by_skill.pop(skill_id, [])):
+                    self.unlink(vacancy_id, skill_id)
+
+    def similar(self, vacancy_id, limit):
+        self.ensure_loaded()
+
+        with self.lock:
+            skill_ids = self.skills_by_vacancy.get(vacancy_id, [])
+            overlaps = Counter()
+            for skill_id in skill_ids:
+                overlaps.update(self.vacancies_by_skill.get(skill_id, []))
+            overlaps.pop(vacancy_id, None)
+
+            scores = (
+                (overlap / (len(skill_ids) + len(self.skills_by_vacancy[other_id]) - overlap), other_id)
+                for other_id, overlap in overlaps.items()
+            )
+            # best score first, lower id wins ties
+            return [(other_id, score) for score, other_id in heapq.nlargest(limit, scores, key=lambda s: (s[0], -s[1]))]
+
+
+skill_index = SkillIndex()
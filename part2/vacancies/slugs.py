@@ -0,0 +1,36 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from vacancies.models import Vacancy
+
+
+class SlugCache:
+    # bounded LRU of slug -> vacancy id, so slug pages cost one primary key lookup
+    def __init__(self, max_size):
+        self.lock = threading.Lock()
+        self.max_size = max_size
+        self.ids = OrderedDict()
+
+    def resolve(self, slug):
+        with self.lock:
+            if slug in self.ids:
+                self.ids.move_to_end(slug)
+                return self.ids[slug]
+
+        vacancy_id = Vacancy.objects.filter(slug=slug).values_list("id", flat=True).first()
+        if vacancy_id is not None:
+            with self.lock:
+                self.ids[slug] = vacancy_id
+                if len(self.ids) > self.max_size:
+                    self.ids.popitem(last=False)
+        return vacancy_id
+
+    def invalidate(self, *slugs):
+        with self.lock:
+            for slug in slugs:
+                self.ids.pop(slug, None)
+
+
+slug_cache = SlugCache(settings.SLUG_CACHE_SIZE)
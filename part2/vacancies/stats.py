@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from vacancies.models import UserVacancyStats, Skill, Vacancy
+
+
+def changed_count(field, delta):
+    # a counter that drifted low, e.g. through queryset.update(), stops at 0 instead of failing
+    # the user's write on the CHECK constraint, rebuild_user_stats and reconcile_skill_counts fix the drift
+    return Greatest(F(field) + delta, Value(0))
+
+
+def change_user_vacancies_count(user_id, delta):
+    if user_id is None:
+        return
+
+    updated = UserVacancyStats.objects.filter(user_id=user_id).update(vacancies_count=changed_count("vacancies_count", delta))
+    if not updated and delta > 0:
+        _, created = UserVacancyStats.objects.get_or_create(user_id=user_id, defaults={"vacancies_count": delta})
+        if not created:
+            UserVacancyStats.objects.filter(user_id=user_id).update(vacancies_count=changed_count("vacancies_count", delta))
+
+
+def count_user_vacancies():
+    users_qs = User.objects.annotate(vacancies=Count("vacancy")).filter(vacancies__gt=0)
+    return dict(users_qs.values_list("id", "vacancies"))
+
+
+def rebuild_user_stats():
+    counts = count_user_vacancies()
+    with transaction.atomic():
+        UserVacancyStats.objects.all().delete()
+        UserVacancyStats.objects.bulk_create(
+            [UserVacancyStats(user_id=user_id, vacancies_count=count) for user_id, count in counts.items()],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def find_user_stats_mismatches():
+    expected = count_user_vacancies()
+    stored = dict(UserVacancyStats.objects.exclude(vacancies_count=0).values_list("user_id", "vacancies_count"))
+
+    return {
+        user_id: (stored.get(user_id, 0), expected.get(user_id, 0))
+        for user_id in expected.keys() | stored.keys()
+        if stored.get(user_id, 0) != expected.get(user_id, 0)
+    }
+
+
+def change_skill_vacancy_counts(deltas):
+    # one UPDATE per distinct delta instead of one per skill
+    skill_ids_by_delta = defaultdict(list)
+    for skill_id, delta in deltas.items():
+        if delta:
+            skill_ids_by_delta[delta].append(skill_id)
+
+    for delta, skill_ids in skill_ids_by_delta.items():
+        Skill.objects.filter(pk__in=skill_ids).update(vacancy_count=changed_count("vacancy_count", delta))
+
+
+def reconcile_skill_counts():
+    through = Vacancy.skills.through
+    actual_counts = through.objects.filter(skill_id=OuterRef("pk")).values("skill_id").annotate(
+        total=Count("vacancy_id")
+    ).values("total")
+
+    mismatched = Skill.objects.annotate(actual=Coalesce(Subquery(actual_counts), 0)).exclude(vacancy_count=F("actual"))
+    fixed = 0
+    for skill_id, actual in mismatched.values_list("id", "actual").iterator():
+        Skill.objects.filter(pk=skill_id).update(vacancy_count=actual)
+        fixed += 1
+    return fixed
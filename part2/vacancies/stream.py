@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from django.conf import settings
+
+from vacancies.events import vacancy_events
+
+
+def format_event(event):
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def vacancy_stream(scope, receive, send):
+    # raw ASGI app, Django 3.2 can only stream responses from sync iterators
+    if scope["method"] != "GET":
+        await send({"type": "http.response.start", "status": 405, "headers": [(b"allow", b"GET")]})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    queue = vacancy_events.subscribe()
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b"retry: 5000\n\n", "more_body": True})
+
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnect},
+                timeout=settings.VACANCY_STREAM_KEEPALIVE,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnect in done:
+                next_event.cancel()
+                return
+            if next_event in done:
+                body = format_event(next_event.result())
+            else:
+                next_event.cancel()
+                body = b": keep-alive\n\n"
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+    finally:
+        disconnect.cancel()
+        vacancy_events.unsubscribe(queue)
@@ -1,3 +1,395 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Max
+from django.contrib import admin
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from hunting.cache import bump_namespace_version
+from vacancies.admin import VacancyAdmin
+from vacancies.events import vacancy_events
+from vacancies.management.commands.export_columnar import pa
+from vacancies.models import Skill, UserVacancyStats, Vacancy
+from vacancies.views import VACANCY_CACHE
+
+
+def get_vacancies_count(user):
+    return UserVacancyStats.objects.filter(user=user).values_list("vacancies_count", flat=True).first()
+
+
+def get_skill_counts():
+    return dict(Skill.objects.values_list("name", "vacancy_count"))
+
+
+class UserVacancyStatsTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+
+    def test_create_counts_vacancy(self):
+        Vacancy.objects.create(slug="first", user=self.alice)
+        Vacancy.objects.create(slug="second", user=self.alice)
+        Vacancy.objects.create(slug="nobody")
+
+        self.assertEqual(get_vacancies_count(self.alice), 2)
+
+    def test_reassign_moves_count(self):
+        vacancy = Vacancy.objects.create(slug="first", user=self.alice)
+
+        vacancy.user = self.bob
+        vacancy.save()
+
+        self.assertEqual(get_vacancies_count(self.alice), 0)
+        self.assertEqual(get_vacancies_count(self.bob), 1)
+
+    def test_save_with_deferred_user_keeps_count(self):
+        vacancy = Vacancy.objects.create(slug="first", user=self.alice)
+
+        deferred = Vacancy.objects.only("id", "name").get(pk=vacancy.pk)
+        deferred.name = "renamed"
+        deferred.save()
+
+        self.assertEqual(get_vacancies_count(self.alice), 1)
+
+    def test_reassign_deferred_user_moves_count(self):
+        vacancy = Vacancy.objects.create(slug="first", user=self.alice)
+
+        deferred = Vacancy.objects.only("id").get(pk=vacancy.pk)
+        deferred.user = self.bob
+        deferred.save()
+
+        self.assertEqual(get_vacancies_count(self.alice), 0)
+        self.assertEqual(get_vacancies_count(self.bob), 1)
+
+    def test_delete_uncounts_vacancy(self):
+        vacancy = Vacancy.objects.create(slug="first", user=self.alice)
+
+        vacancy.delete()
+
+        self.assertEqual(get_vacancies_count(self.alice), 0)
+
+    def test_drifted_count_does_not_block_delete(self):
+        Vacancy.objects.create(slug="gone", user=self.bob).delete()
+        vacancy = Vacancy.objects.create(slug="first", user=self.alice)
+        # update() skips the signals, so bob's count stays at 0 with one vacancy
+        Vacancy.objects.filter(pk=vacancy.pk).update(user=self.bob)
+
+        Vacancy.objects.get(pk=vacancy.pk).delete()
+
+        self.assertEqual(get_vacancies_count(self.bob), 0)
+
+
+class SkillVacancyCountTests(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="python")
+        self.django = Skill.objects.create(name="django")
+        self.first = Vacancy.objects.create(slug="first")
+        self.second = Vacancy.objects.create(slug="second")
+
+    def test_add(self):
+        self.first.skills.add(self.python, self.django)
+        self.python.vacancy_set.add(self.second)
+
+        self.assertEqual(get_skill_counts(), {"python": 2, "django": 1})
+
+    def test_add_existing_link_is_not_counted_twice(self):
+        self.first.skills.add(self.python)
+        self.first.skills.add(self.python)
+
+        self.assertEqual(get_skill_counts(), {"python": 1, "django": 0})
+
+    def test_remove(self):
+        self.first.skills.add(self.python, self.django)
+        self.second.skills.add(self.python)
+
+        self.first.skills.remove(self.python)
+        self.django.vacancy_set.remove(self.first)
+
+        self.assertEqual(get_skill_counts(), {"python": 1, "django": 0})
+
+    def test_clear(self):
+        self.first.skills.add(self.python, self.django)
+        self.second.skills.add(self.python, self.django)
+
+        self.first.skills.clear()
+        self.assertEqual(get_skill_counts(), {"python": 1, "django": 1})
+
+        self.python.vacancy_set.clear()
+        self.assertEqual(get_skill_counts(), {"python": 0, "django": 1})
+
+    def test_vacancy_delete(self):
+        self.first.skills.add(self.python, self.django)
+        self.second.skills.add(self.python)
+
+        self.first.delete()
+
+        self.assertEqual(get_skill_counts(), {"python": 1, "django": 0})
+
+    def test_drifted_count_does_not_block_remove(self):
+        # bulk_create skips m2m_changed, so python's count stays at 0 with one link
+        Vacancy.skills.through.objects.bulk_create([
+            Vacancy.skills.through(vacancy_id=self.first.pk, skill_id=self.python.pk),
+        ])
+
+        self.first.skills.remove(self.python)
+
+        self.assertEqual(get_skill_counts(), {"python": 0, "django": 0})
+
+
+@override_settings(CHANGES_ON_PAGE=2)
+class VacancyChangesTests(TestCase):
+    def get_changes(self, since=None):
+        response = self.client.get("/vacancy/changes/", {"since": since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def read_all(self, since=None):
+        changed, deleted = [], []
+        while True:
+            page = self.get_changes(since)
+            changed += [item["id"] for item in page["items"]]
+            deleted += page["deleted"]
+            since = page["next"]
+            if not page["has_more"]:
+                return changed, deleted, since
+
+    def test_pages_through_every_change_once(self):
+        vacancies = [Vacancy.objects.create(slug=f"vacancy-{i}") for i in range(5)]
+
+        changed, deleted, _ = self.read_all()
+
+        self.assertEqual(changed, [vacancy.id for vacancy in vacancies])
+        self.assertEqual(deleted, [])
+
+    def test_since_returns_only_later_changes(self):
+        first, second, third = [Vacancy.objects.create(slug=f"vacancy-{i}") for i in range(3)]
+        _, _, since = self.read_all()
+
+        second.text = "changed"
+        second.save()
+        third_id = third.id
+        third.delete()
+        changed, deleted, since = self.read_all(since)
+
+        self.assertEqual(changed, [second.id])
+        self.assertEqual(deleted, [third_id])
+        self.assertEqual(self.read_all(since)[:2], ([], []))
+
+    def test_save_of_deferred_instance_is_a_change(self):
+        vacancy = Vacancy.objects.create(slug="vacancy")
+        _, _, since = self.read_all()
+
+        deferred = Vacancy.objects.only("id", "name").get(pk=vacancy.pk)
+        deferred.name = "renamed"
+        deferred.save()
+        changed, _, since = self.read_all(since)
+        self.assertEqual(changed, [vacancy.id])
+
+        partial = Vacancy.objects.get(pk=vacancy.pk)
+        partial.text = "changed"
+        partial.save(update_fields=["text"])
+        changed, _, since = self.read_all(since)
+        self.assertEqual(changed, [vacancy.id])
+
+    def test_invalid_since(self):
+        positions = [[], "cursor", {"vacancies": ["garbage", 1]}, {"vacancies": ["2026-01-01T00:00:00", "x"]}]
+        tokens = ["not-a-cursor"] + [base64.urlsafe_b64encode(json.dumps(p).encode()).decode() for p in positions]
+        for token in tokens:
+            with self.subTest(token=token):
+                response = self.client.get("/vacancy/changes/", {"since": token})
+
+                self.assertEqual(response.status_code, 400)
+
+
+class VacancyEventTests(TestCase):
+    def published(self, change):
+        with mock.patch.object(vacancy_events, "dispatch") as dispatch:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return [(call.args[0]["event"], call.args[0]["id"]) for call in dispatch.call_args_list]
+
+    def test_skill_changes_publish_updates(self):
+        vacancy = Vacancy.objects.create(slug="a", text="")
+        python = Skill.objects.create(name="python")
+
+        self.assertEqual(self.published(lambda: vacancy.skills.add(python)), [("updated", vacancy.id)])
+        self.assertEqual(self.published(lambda: python.vacancy_set.clear()), [("updated", vacancy.id)])
+
+    def test_admin_action_publishes_updates(self):
+        opened = Vacancy.objects.create(slug="a", text="", status="open")
+        Vacancy.objects.create(slug="b", text="", status="draft")
+        model_admin = VacancyAdmin(Vacancy, admin.site)
+
+        with mock.patch.object(model_admin, "message_user"):
+            published = self.published(lambda: model_admin.close_vacancies(
+                RequestFactory().post("/"), Vacancy.objects.filter(status="open"),
+            ))
+
+        self.assertEqual(published, [("updated", opened.id)])
+
+    def test_idle_listener_checks_its_connection(self):
+        raw_connection = mock.MagicMock(notifies=[])
+        raw_connection.cursor.return_value.__enter__.return_value.execute.side_effect = OSError("connection lost")
+
+        with mock.patch("vacancies.events.select.select", return_value=([], [], [])) as select:
+            with self.assertRaises(OSError):
+                vacancy_events.receive(raw_connection)
+
+        self.assertEqual(select.call_args.args[3], 30)
+
+
+class SchemaErrorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+
+    def post_json(self, url, body):
+        return self.client.post(url, body, content_type="application/json")
+
+    def test_create_invalid_json(self):
+        response = self.post_json("/vacancy/create/", "{not json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"body": "Invalid JSON"}})
+
+    def test_create_not_an_object(self):
+        response = self.post_json("/vacancy/create/", [])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"body": "Must be a JSON object"}})
+
+    def test_create_reports_every_field(self):
+        response = self.post_json("/vacancy/create/", {
+            "slug": "not a slug",
+            "status": "unknown",
+            "user_id": 0,
+            "skills": ["python", ""],
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {
+            "slug": "Has an invalid format",
+            "text": "This field is required",
+            "status": "Must be one of: closed, draft, open",
+            "user_id": "Must be at least 1",
+            "skills": "Item 1: Must be at least 1 characters",
+        }})
+        self.assertFalse(Vacancy.objects.exists())
+
+    def test_create_valid(self):
+        response = self.post_json("/vacancy/create/", {
+            "slug": "python-dev",
+            "text": "text",
+            "status": "open",
+            "user_id": str(self.user.pk),
+            "skills": ["python"],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        vacancy = Vacancy.objects.get(slug="python-dev")
+        self.assertEqual(vacancy.user, self.user)
+        self.assertEqual(list(vacancy.skills.values_list("name", flat=True)), ["python"])
+
+    def test_update_invalid(self):
+        vacancy = Vacancy.objects.create(slug="python-dev")
+
+        response = self.post_json(f"/vacancy/{vacancy.pk}/update/", {"slug": "python-dev", "text": 1, "status": "open"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"text": "Must be a string"}})
+
+    def test_batch_ids_must_be_list(self):
+        response = self.post_json("/vacancy/batch/", {"ids": "1,2"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"ids": "Must be a list"}})
+
+
+class VacancySlugTests(TestCase):
+    def test_stale_slug_mapping_is_not_served(self):
+        first = Vacancy.objects.create(slug="python-dev")
+        second = Vacancy.objects.create(slug="go-dev")
+        self.assertEqual(self.client.get("/vacancy/s/python-dev/").json()["id"], first.id)
+
+        # another worker moves the slug, its signals never reach this process's slug cache
+        Vacancy.objects.filter(pk=first.pk).update(slug="renamed")
+        Vacancy.objects.filter(pk=second.pk).update(slug="python-dev")
+        bump_namespace_version(VACANCY_CACHE)
+
+        self.assertEqual(self.client.get("/vacancy/s/python-dev/").json()["id"], second.id)
+        self.assertEqual(self.client.get("/vacancy/s/renamed/").json()["id"], first.id)
+        self.assertEqual(self.client.get("/vacancy/s/go-dev/").status_code, 404)
+
+
+class UniqueSlugMigrationTests(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(target)
+        return executor.loader.project_state(target[0]).apps
+
+    def test_suffix_skips_slugs_already_taken(self):
+        apps = self.migrate([("vacancies", "0012_skill_vacancy_count")])
+        OldVacancy = apps.get_model("vacancies", "Vacancy")
+        for pk, slug in [(1, "a"), (2, "a"), (3, "a-2"), (4, "a"), (5, "a-4")]:
+            OldVacancy.objects.create(pk=pk, slug=slug, name="", text="")
+
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+        self.assertEqual(
+            dict(Vacancy.objects.values_list("id", "slug")),
+            {1: "a", 2: "a-2-2", 3: "a-2", 4: "a-4-2", 5: "a-4"},
+        )
+
+
+@skipUnless(pa is not None, "export_columnar needs pyarrow")
+class ExportColumnarTests(TestCase):
+    def export(self, table):
+        with tempfile.TemporaryDirectory() as output:
+            call_command("export_columnar", output, stdout=open(os.devnull, "w"))
+            return pa.parquet.read_table(os.path.join(output, table + ".parquet")).to_pydict()
+
+    def test_status_outside_choices_is_exported(self):
+        Vacancy.objects.create(slug="a", text="", status="open")
+        legacy = Vacancy.objects.create(slug="b", text="")
+        Vacancy.objects.filter(pk=legacy.pk).update(status="paused")
+
+        self.assertEqual(self.export("vacancies")["status"], ["open", "paused"])
+
+    def test_skill_links_use_skill_names(self):
+        vacancy = Vacancy.objects.create(slug="a", text="")
+        vacancy.skills.add(Skill.objects.create(name="python"), Skill.objects.create(name="sql"))
+
+        self.assertEqual(sorted(self.export("vacancy_skills")["skill"]), ["python", "sql"])
+
+
+@skipUnless(connection.vendor == "postgresql", "the BRIN index on created only exists on PostgreSQL")
+class CreatedBrinIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # rows arrive in created order, the layout BRIN is built for
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO vacancies_vacancy (slug, name, text, status, created, updated_at, is_archived)
+                SELECT 'seed-' || n, 'vacancy ' || n, '', 'open', DATE '2024-01-01' + n / 50, now(), false
+                FROM generate_series(1, 50000) AS n
+            """)
+            cursor.execute("ANALYZE vacancies_vacancy")
+
+    def test_recent_vacancies_filter_uses_brin_index(self):
+        newest = Vacancy.objects.aggregate(newest=Max("created"))["newest"]
+        queryset = Vacancy.objects.filter(created__gte=newest - timedelta(days=7)).values("id", "name")
+
+        self.assertIn("vacancies_vacancy_created_brin", queryset.explain())
+
+    def test_newest_first_page_uses_btree_index(self):
+        queryset = Vacancy.objects.order_by("-created", "-id").values("id", "name")[:20]
+
+        self.assertIn("vacancies_v_created_88fbc2_idx", queryset.explain())
@@ -1,11 +1,19 @@
 from django.urls import path
 
-from vacancies.views import VacancyListView, VacancyDetailView, VacancyCreateView, VacancyUpdateView, VacancyDeleteView
+from vacancies.views import VacancyListView, VacancyDetailView, VacancyCreateView, VacancyUpdateView, VacancyDeleteView, \
+    VacancyChangesView, VacancyBatchView, UserVacancyDetailView, VacancySimilarView, TopSkillsView, \
+    VacancySlugDetailView
 
 urlpatterns = [
     path('', VacancyListView.as_view()),
     path('create/', VacancyCreateView.as_view()),
+    path('changes/', VacancyChangesView.as_view()),
+    path('batch/', VacancyBatchView.as_view()),
+    path('by_user/', UserVacancyDetailView.as_view()),
+    path('skills/top/', TopSkillsView.as_view()),
     path('<int:pk>/', VacancyDetailView.as_view()),
+    path('s/<slug:slug>/', VacancySlugDetailView.as_view()),
+    path('<int:pk>/similar/', VacancySimilarView.as_view()),
     path('<int:pk>/update/', VacancyUpdateView.as_view()),
     path('<int:pk>/delete/', VacancyDeleteView.as_view()),
 ]
\ No newline at end of file
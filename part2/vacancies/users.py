@@ -0,0 +1,43 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+
+class UserExistenceCache:
+    # bounded LRU of user ids known to exist, entries expire after a timeout because
+    # deletes in other processes only reach this one through the foreign key check
+    def __init__(self, max_size, timeout):
+        self.lock = threading.Lock()
+        self.max_size = max_size
+        self.timeout = timeout
+        self.expires = OrderedDict()
+
+    def exists(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            if self.expires.get(user_id, 0) > now:
+                self.expires.move_to_end(user_id)
+                return True
+
+        # misses are not cached, a user created a moment ago must be usable right away
+        if not User.objects.filter(pk=user_id).exists():
+            self.invalidate(user_id)
+            return False
+
+        with self.lock:
+            self.expires[user_id] = now + self.timeout
+            self.expires.move_to_end(user_id)
+            if len(self.expires) > self.max_size:
+                self.expires.popitem(last=False)
+        return True
+
+    def invalidate(self, *user_ids):
+        with self.lock:
+            for user_id in user_ids:
+                self.expires.pop(user_id, None)
+
+
+user_cache = UserExistenceCache(settings.USER_EXISTS_CACHE_SIZE, settings.USER_EXISTS_CACHE_TIMEOUT)
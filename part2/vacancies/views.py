@@ -1,47 +1,157 @@
+import base64
 import json
 
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from django.db.models import Count, Avg
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date, parse_datetime
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import DetailView, ListView, CreateView, UpdateView, DeleteView
 
-from vacancies.models import Vacancy, Skill
+from hunting.cache import cached_json_response
+from hunting.ratelimit import rate_limit
+from hunting.schema import SchemaError
+from vacancies.models import Vacancy, Skill, VacancyTombstone, UserVacancyStats
+from vacancies.popularity import view_counter
+from vacancies.schemas import VACANCY_CREATE_SCHEMA, VACANCY_UPDATE_SCHEMA, VACANCY_IDS_SCHEMA
+from vacancies.similarity import skill_index
+from vacancies.slugs import slug_cache
+from vacancies.users import user_cache
+
+
+VACANCY_CACHE = "vacancies"
+
+VACANCY_LIST_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "text": "text",
+    "username": "user__username",
+    "skills": None,
+}
+
+VACANCY_DETAIL_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "user_id": "user_id",
+    "slug": "slug",
+    "status": "status",
+    "skills": None,
+    "created": "created",
+    "updated_at": "updated_at",
+}
+
+
+VACANCY_ORDERINGS = {
+    "name": ["name", "id"],
+    "-name": ["-name", "-id"],
+    "created": ["created", "id"],
+    "-created": ["-created", "-id"],
+}
+
+
+def filter_by_created(queryset, request):
+    for param, lookup in (("created_from", "created__gte"), ("created_to", "created__lte")):
+        value = request.GET.get(param)
+        if not value:
+            continue
+
+        created = parse_date(value)
+        if created is None:
+            raise ValueError(f"{param} must be a date in YYYY-MM-DD format")
+        queryset = queryset.filter(**{lookup: created})
+
+    return queryset
+
+
+def get_requested_fields(request, available_fields):
+    fields = request.GET.get("fields")
+    if not fields:
+        return list(available_fields)
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in available_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return requested
+
+
+def get_field_lookups(fields, available_fields):
+    lookups = ["id"] + [available_fields[field] for field in fields if available_fields[field]]
+    return list(dict.fromkeys(lookups))
+
+
+def get_skill_names(vacancy_ids):
+    skills = {vacancy_id: [] for vacancy_id in vacancy_ids}
+    through_rows = Vacancy.skills.through.objects.filter(vacancy_id__in=vacancy_ids).values_list(
+        "vacancy_id", "skill__name"
+    )
+    for vacancy_id, skill_name in through_rows:
+        skills[vacancy_id].append(skill_name)
+
+    return skills
+
+
+def serialize_vacancies(rows, fields, available_fields):
+    rows = list(rows)
+    skills = get_skill_names([row["id"] for row in rows]) if "skills" in fields else {}
+
+    items = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            if field == "skills":
+                item[field] = skills[row["id"]]
+            else:
+                item[field] = row[available_fields[field]]
+        items.append(item)
+
+    return items
 
 
 class VacancyListView(ListView):
     model = Vacancy
 
     def get(self, request, *args, **kwargs):
+        return cached_json_response(request, VACANCY_CACHE, lambda: self.build_response(request, *args, **kwargs))
+
+    def build_response(self, request, *args, **kwargs):
         super().get(request, *args, **kwargs)
 
+        try:
+            fields = get_requested_fields(request, VACANCY_LIST_FIELDS)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
         search_text = request.GET.get("text", None)
         if search_text:
             self.object_list = self.object_list.filter(text=search_text)
 
-        self.object_list = self.object_list.select_related('user').prefetch_related('skills')
+        try:
+            self.object_list = filter_by_created(self.object_list, request)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        ordering = request.GET.get("ordering")
+        if ordering:
+            if ordering not in VACANCY_ORDERINGS:
+                return JsonResponse({"error": f"ordering must be one of: {', '.join(VACANCY_ORDERINGS)}"}, status=400)
+            self.object_list = self.object_list.order_by(*VACANCY_ORDERINGS[ordering])
+
+        self.object_list = self.object_list.values(*get_field_lookups(fields, VACANCY_LIST_FIELDS))
 
         paginator = Paginator(self.object_list, settings.TOTAL_ON_PAGE)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
 
-        vacancies = []
-        for vacancy in self.object_list:
-            vacancies.append({
-                "id": vacancy.id,
-                "name": vacancy.name,
-                "text": vacancy.text,
-                "username": vacancy.user.username,
-                "skills": list(map(str, vacancy.skills.all())),
-            })
-
         response = {
-            "items": vacancies,
+            "items": serialize_vacancies(page_obj, fields, VACANCY_LIST_FIELDS),
             "num_pages": page_obj.paginator.num_pages,
             "total": page_obj.paginator.count,
         }
@@ -52,35 +162,228 @@ class VacancyDetailView(DetailView):
     model = Vacancy
 
     def get(self, request, *args, **kwargs):
-        vacancy = self.get_object()
+        view_counter.hit(self.kwargs["pk"])
+        return cached_json_response(request, VACANCY_CACHE, lambda: self.build_response(request))
+
+    def build_response(self, request):
+        try:
+            fields = get_requested_fields(request, VACANCY_DETAIL_FIELDS)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        queryset = self.get_queryset().values(*get_field_lookups(fields, VACANCY_DETAIL_FIELDS))
+        vacancy = self.get_object(queryset)
+
+        return JsonResponse(serialize_vacancies([vacancy], fields, VACANCY_DETAIL_FIELDS)[0])
+
+
+def parse_vacancy_ids(raw_ids):
+    if isinstance(raw_ids, str):
+        raw_ids = [raw_id for raw_id in raw_ids.split(",") if raw_id.strip()]
+    if not isinstance(raw_ids, list):
+        raise ValueError("ids must be a list")
+
+    try:
+        ids = list(dict.fromkeys(int(raw_id) for raw_id in raw_ids))
+    except (ValueError, TypeError):
+        raise ValueError("ids must be integers")
+
+    if not ids:
+        raise ValueError("ids are required")
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise ValueError(f"No more than {settings.BATCH_MAX_IDS} ids per request")
+
+    return ids
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class VacancyBatchView(View):
+    def get(self, request):
+        return self.get_vacancies(request, request.GET.get("ids", ""))
+
+    def post(self, request):
+        try:
+            data = VACANCY_IDS_SCHEMA.parse(request.body)
+        except SchemaError as e:
+            return JsonResponse({"errors": e.args[0]}, status=400)
+
+        return self.get_vacancies(request, data["ids"])
+
+    def get_vacancies(self, request, raw_ids):
+        try:
+            ids = parse_vacancy_ids(raw_ids)
+            fields = get_requested_fields(request, VACANCY_DETAIL_FIELDS)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        rows = Vacancy.objects.filter(id__in=ids).values(*get_field_lookups(fields, VACANCY_DETAIL_FIELDS))
+        rows_by_id = {row["id"]: row for row in rows}
+        found = [rows_by_id[vacancy_id] for vacancy_id in ids if vacancy_id in rows_by_id]
 
         return JsonResponse({
-            "id": vacancy.id,
-            "text": vacancy.text,
-            "user_id": vacancy.user_id,
-            "slug": vacancy.slug,
-            "status": vacancy.status,
-            "skills": list(vacancy.skills.all().values_list("name", flat=True)),
-            "created": vacancy.created,
+            "items": serialize_vacancies(found, fields, VACANCY_DETAIL_FIELDS),
+            "missing": [vacancy_id for vacancy_id in ids if vacancy_id not in rows_by_id],
         })
 
 
+class VacancySimilarView(View):
+    def get(self, request, pk):
+        try:
+            fields = get_requested_fields(request, VACANCY_LIST_FIELDS)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        try:
+            limit = min(int(request.GET.get("limit", settings.TOTAL_ON_PAGE)), settings.SIMILAR_MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({"error": "limit must be an integer"}, status=400)
+
+        get_object_or_404(Vacancy.objects.only("id"), pk=pk)
+        similar = skill_index.similar(pk, limit)
+
+        rows = Vacancy.objects.filter(id__in=[vacancy_id for vacancy_id, _ in similar])
+        rows_by_id = {row["id"]: row for row in rows.values(*get_field_lookups(fields, VACANCY_LIST_FIELDS))}
+        found = [(rows_by_id[vacancy_id], score) for vacancy_id, score in similar if vacancy_id in rows_by_id]
+
+        items = serialize_vacancies([row for row, _ in found], fields, VACANCY_LIST_FIELDS)
+        for item, (_, score) in zip(items, found):
+            item["score"] = round(score, 4)
+
+        return JsonResponse({"items": items})
+
+
+class TopSkillsView(View):
+    def get(self, request):
+        try:
+            limit = min(int(request.GET.get("limit", settings.TOTAL_ON_PAGE)), settings.TOP_SKILLS_MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({"error": "limit must be an integer"}, status=400)
+
+        skills = Skill.objects.order_by("-vacancy_count", "id").values("id", "name", "vacancy_count")[:max(limit, 0)]
+        return JsonResponse({"items": list(skills)})
+
+
+class VacancySlugDetailView(VacancyDetailView):
+    # the row is fetched by pk and slug, so a stale slug -> id mapping is a miss and not another vacancy
+    query_pk_and_slug = True
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return self.get_by_slug(request, kwargs["slug"])
+        except Http404:
+            # the slug may have changed in another process, whose save only cleared its own cache
+            slug_cache.invalidate(kwargs["slug"])
+            return self.get_by_slug(request, kwargs["slug"])
+
+    def get_by_slug(self, request, slug):
+        vacancy_id = slug_cache.resolve(slug)
+        if vacancy_id is None:
+            raise Http404("Vacancy not found")
+
+        self.kwargs = {"pk": vacancy_id, "slug": slug}
+        return super().get(request, pk=vacancy_id)
+
+
+def encode_changes_cursor(cursor):
+    position = {key: [value[0].isoformat(), value[1]] for key, value in cursor.items()}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_changes_cursor(token):
+    cursor = {"vacancies": None, "deleted": None}
+    if not token:
+        return cursor
+
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if not isinstance(position, dict):
+            raise ValueError
+        for key in cursor:
+            if position.get(key):
+                timestamp, last_id = position[key]
+                timestamp = parse_datetime(timestamp)
+                if timestamp is None:
+                    raise ValueError
+                cursor[key] = (timestamp, int(last_id))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid since token")
+
+    return cursor
+
+
+def after_cursor(queryset, timestamp_field, id_field, position):
+    if position is None:
+        return queryset
+
+    timestamp, last_id = position
+    return queryset.filter(
+        Q(**{f"{timestamp_field}__gt": timestamp})
+        | Q(**{timestamp_field: timestamp, f"{id_field}__gt": last_id})
+    )
+
+
+class VacancyChangesView(View):
+    def get(self, request):
+        try:
+            cursor = decode_changes_cursor(request.GET.get("since"))
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        limit = settings.CHANGES_ON_PAGE
+
+        vacancies_qs = after_cursor(Vacancy.objects.all(), "updated_at", "id", cursor["vacancies"])
+        lookups = get_field_lookups(VACANCY_DETAIL_FIELDS, VACANCY_DETAIL_FIELDS)
+        changed = list(vacancies_qs.order_by("updated_at", "id").values(*lookups)[:limit + 1])
+
+        deleted_qs = after_cursor(VacancyTombstone.objects.all(), "deleted_at", "id", cursor["deleted"])
+        deleted = list(deleted_qs.order_by("deleted_at", "id").values("id", "vacancy_id", "deleted_at")[:limit + 1])
+
+        has_more = len(changed) > limit or len(deleted) > limit
+        changed, deleted = changed[:limit], deleted[:limit]
+
+        if changed:
+            cursor["vacancies"] = (changed[-1]["updated_at"], changed[-1]["id"])
+        if deleted:
+            cursor["deleted"] = (deleted[-1]["deleted_at"], deleted[-1]["id"])
+
+        response = {
+            "items": serialize_vacancies(changed, list(VACANCY_DETAIL_FIELDS), VACANCY_DETAIL_FIELDS),
+            "deleted": [tombstone["vacancy_id"] for tombstone in deleted],
+            "has_more": has_more,
+            "next": encode_changes_cursor({key: value for key, value in cursor.items() if value}),
+        }
+        return JsonResponse(response)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(rate_limit("vacancy_create"), name='dispatch')
 class VacancyCreateView(CreateView):
     model = Vacancy
     fields = ["user", "slug", "text", "status", "created", "skills"]
 
     def post(self, request, *args, **kwargs):
-        vacancy_data = json.loads(request.body)
-
-        vacancy = Vacancy.objects.create(
-            slug=vacancy_data["slug"],
-            text=vacancy_data["text"],
-            status=vacancy_data["status"],
-        )
-
-        vacancy.user = get_object_or_404(User, pk=vacancy_data["user_id"])
-        vacancy.save()
+        try:
+            vacancy_data = VACANCY_CREATE_SCHEMA.parse(request.body)
+        except SchemaError as e:
+            return JsonResponse({"errors": e.args[0]}, status=400)
+
+        if not user_cache.exists(vacancy_data["user_id"]):
+            raise Http404("User not found")
+
+        try:
+            with transaction.atomic():
+                vacancy = Vacancy.objects.create(
+                    slug=vacancy_data["slug"],
+                    text=vacancy_data["text"],
+                    status=vacancy_data["status"],
+                    user_id=vacancy_data["user_id"],
+                )
+        except IntegrityError:
+            # the cached user may have been deleted by another process since
+            user_cache.invalidate(vacancy_data["user_id"])
+            if not user_cache.exists(vacancy_data["user_id"]):
+                raise Http404("User not found")
+            return JsonResponse({"error": "Vacancy with this slug already exists"}, status=400)
 
         for skill in vacancy_data["skills"]:
             skill_obj, _ = Skill.objects.get_or_create(name=skill)
@@ -93,23 +396,32 @@ class VacancyCreateView(CreateView):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(rate_limit("vacancy_update"), name='dispatch')
 class VacancyUpdateView(UpdateView):
     model = Vacancy
     fields = ["slug", "text", "status", "skills"]
 
     def post(self, request, *args, **kwargs):
-        super().post(request, *args, **kwargs)
+        self.object = self.get_object()
+
+        try:
+            vacancy_data = VACANCY_UPDATE_SCHEMA.parse(request.body)
+        except SchemaError as e:
+            return JsonResponse({"errors": e.args[0]}, status=400)
 
-        vacancy_data = json.loads(request.body)
         self.object.slug = vacancy_data["slug"]
         self.object.text = vacancy_data["text"]
         self.object.status = vacancy_data["status"]
 
+        try:
+            with transaction.atomic():
+                self.object.save()
+        except IntegrityError:
+            return JsonResponse({"error": "Vacancy with this slug already exists"}, status=400)
+
         for skill in vacancy_data["skills"]:
             skill_obj, _ = Skill.objects.get_or_create(name=skill)
             self.object.skills.add(skill_obj)
-
-        self.object.save()
         return JsonResponse({
             "id": self.object.id,
             "user_id": self.object.user_id,
@@ -122,6 +434,7 @@ class VacancyUpdateView(UpdateView):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(rate_limit("vacancy_delete"), name='dispatch')
 class VacancyDeleteView(DeleteView):
     model = Vacancy
     success_url = "/"
@@ -134,24 +447,29 @@ class VacancyDeleteView(DeleteView):
 
 class UserVacancyDetailView(View):
     def get(self, request):
-        users_qs = User.objects.annotate(vacancies=Count('vacancy'))
+        users_qs = User.objects.select_related("vacancy_stats").only("id", "username", "vacancy_stats__vacancies_count")
+        users_qs = users_qs.order_by("id")
 
         paginator = Paginator(users_qs, settings.TOTAL_ON_PAGE)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
 
         users = []
-        for user in users_qs:
+        for user in page_obj:
+            stats = getattr(user, "vacancy_stats", None)
             users.append({
                 "id": user.id,
                 "name": user.username,
-                "vacancies": user.vacancies,
+                "vacancies": stats.vacancies_count if stats else 0,
             })
 
+        total_vacancies = UserVacancyStats.objects.aggregate(total=Sum("vacancies_count"))["total"] or 0
+        total_users = page_obj.paginator.count
+
         response = {
             "items": users,
-            "avg": users_qs.aggregate(Avg('vacancies')),
+            "avg": {"vacancies__avg": total_vacancies / total_users if total_users else None},
             "num_pages": page_obj.paginator.num_pages,
-            "total": page_obj.paginator.count,
+            "total": total_users,
         }
         return JsonResponse(response, safe=False)